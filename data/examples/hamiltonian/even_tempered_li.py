@@ -12,13 +12,14 @@ nbasis = 30
 lnratio = (np.log(alpha_high) - np.log(alpha_low))/(nbasis-1)
 
 # build a list of "contractions". These aren't real contractions as every
-# contraction only contains one basis function.
-bcs = []
-for ibasis in range(nbasis):
-    alpha = alpha_low * np.exp(lnratio * ibasis)
-    # arguments of GOBasisContraction:
-    #     shell_type, list of exponents, list of contraction coefficients
-    bcs.append(GOBasisContraction(0, np.array([alpha]), np.array([1.0])))
+# contraction only contains one basis function. All exponents are computed at
+# once and each contraction gets a (length-one) view on the arrays below.
+alphas = alpha_low * np.exp(lnratio * np.arange(nbasis, dtype=float))
+con_coeffs = np.ones(nbasis)
+# arguments of GOBasisContraction:
+#     shell_type, list of exponents, list of contraction coefficients
+bcs = [GOBasisContraction(0, alphas[ibasis:ibasis+1], con_coeffs[ibasis:ibasis+1])
+       for ibasis in range(nbasis)]
 
 # Finish setting up the basis set:
 ba = GOBasisAtom(bcs)
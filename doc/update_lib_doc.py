@@ -23,31 +23,46 @@
 
 import importlib, os
 from glob import glob
-from io import StringIO
 
 from common import write_if_changed
 
 
+def scan_package(path):
+    """Return the subdirectories and modules in a package directory.
+
+    Each directory is scanned only once and the entries are classified by their
+    extension. Returns None when path does not contain an __init__.py file.
+    """
+    subdirs = []
+    fns_py = []
+    fns_h = []
+    is_package = False
+    for entry in os.scandir(path):
+        if entry.is_dir():
+            subdirs.append(entry.path)
+        elif entry.name == '__init__.py':
+            is_package = True
+        elif entry.name.endswith('.py') or entry.name.endswith('.so'):
+            fns_py.append(entry.name)
+        elif entry.name.endswith('.h'):
+            fns_h.append(entry.name)
+    if not is_package:
+        return None
+    modules = [fn[:-3] for fn in sorted(fns_py)] + sorted(fns_h)
+    return sorted(subdirs), modules
+
+
 def discover():
-    # find packages
-    packages = {'horton': []}
-    for fn in glob('../horton/*/__init__.py'):
-        subpackage = fn.split('/')[2]
+    # find packages and their modules
+    subdirs, modules = scan_package('../horton')
+    packages = {'horton': modules}
+    for subdir in subdirs:
+        subpackage = os.path.basename(subdir)
         if subpackage == 'test':
             continue
-        packages['horton.%s' % subpackage] = []
-    # find modules
-    for package, modules in packages.items():
-        stub = package.replace('.', '/')
-        for fn in sorted(glob('../%s/*.py' % stub) + glob('../%s/*.so' % stub)):
-            module = fn.split('/')[-1][:-3]
-            if module == '__init__':
-                continue
-            modules.append(module)
-        for fn in sorted(glob('../%s/*.h' % stub)):
-            module = fn.split('/')[-1]
-            modules.append(module)
-
+        result = scan_package(subdir)
+        if result is not None:
+            packages['horton.%s' % subpackage] = result[1]
     return packages
 
 
@@ -68,18 +83,17 @@ def get_first_doxygenline(fn_h):
         raise IOError('UPDATELIBDOCTITLE missing in %s' % fn_h)
 
 
-def underline(line, char, f):
-    print(line, file=f)
-    print(char*len(line), file=f)
-    print(file=f)
+DISCLAIMER = """\
+..
+    This file is automatically generated. Do not make 
+    changes as these will be overwritten. Rather edit 
+    the documentation in the source code.
+
+"""
 
 
-def write_disclaimer(f):
-    print('..', file=f)
-    print('    This file is automatically generated. Do not make ', file=f)
-    print('    changes as these will be overwritten. Rather edit ', file=f)
-    print('    the documentation in the source code.', file=f)
-    print(file=f)
+def underline(line, char):
+    return '%s\n%s\n\n' % (line, char*len(line))
 
 
 def main():
@@ -88,48 +102,40 @@ def main():
     # Write new/updated rst files if needed
     fns_rst = []
     for package, modules in sorted(packages.items()):
-        # write the new file to a StringIO
-        f1 = StringIO()
-        write_disclaimer(f1)
-        underline('``%s`` -- %s' % (package, get_first_docline(package)), '#', f1)
-        print(file=f1)
-        print('.. automodule::', package, file=f1)
-        print('    :members:', file=f1)
-        print(file=f1)
-        print('.. toctree::', file=f1)
-        print('    :maxdepth: 1', file=f1)
-        print('    :numbered:', file=f1)
-        print(file=f1)
+        # collect the contents of the new file in a list of strings
+        parts1 = [
+            DISCLAIMER,
+            underline('``%s`` -- %s' % (package, get_first_docline(package)), '#'),
+            '\n.. automodule:: %s\n    :members:\n\n' % package,
+            '.. toctree::\n    :maxdepth: 1\n    :numbered:\n\n',
+        ]
 
         for module in modules:
-            f2 = StringIO()
-            write_disclaimer(f2)
             if module.endswith('.h'):
-                #full = package + '/' + module
                 fn_h = package.replace('.', '/') + '/' + module
-                underline('``%s`` -- %s' % (fn_h, get_first_doxygenline(fn_h)), '#', f2)
-                print('.. doxygenfile::', fn_h, file=f2)
-                print('    :project: horton', file=f2)
-                print(file=f2)
-                print(file=f2)
+                parts2 = [
+                    DISCLAIMER,
+                    underline('``%s`` -- %s' % (fn_h, get_first_doxygenline(fn_h)), '#'),
+                    '.. doxygenfile:: %s\n    :project: horton\n\n\n' % fn_h,
+                ]
             else:
                 full = package + '.' + module
-                underline('``%s`` -- %s' % (full, get_first_docline(full)), '#', f2)
-                print('.. automodule::', full, file=f2)
-                print('    :members:', file=f2)
-                print(file=f2)
-                print(file=f2)
+                parts2 = [
+                    DISCLAIMER,
+                    underline('``%s`` -- %s' % (full, get_first_docline(full)), '#'),
+                    '.. automodule:: %s\n    :members:\n\n\n' % full,
+                ]
             # write if the contents have changed
             rst_name = 'mod_%s_%s' % (package.replace('.', '_'), module.replace('.', '_'))
             fn2_rst = 'lib/%s.rst' % rst_name
             fns_rst.append(fn2_rst)
-            write_if_changed(fn2_rst, f2.getvalue())
-            print('    %s' % rst_name, file=f1)
+            write_if_changed(fn2_rst, ''.join(parts2))
+            parts1.append('    %s\n' % rst_name)
 
         # write if the contents have changed
         fn1_rst = 'lib/pck_%s.rst' % package.replace('.', '_')
         fns_rst.append(fn1_rst)
-        write_if_changed(fn1_rst, f1.getvalue())
+        write_if_changed(fn1_rst, ''.join(parts1))
 
 
     # Remove other rst files
@@ -70,48 +70,46 @@ double boys_function(long m, double t) {
 }
 
 void boys_function_array(long mmax, double t, double *output) {
-    // for (long m=0; m <= mmax; m++) {
-    //   output[m] = boys_function(m, t);
-    // }
-    // return;
-
     if (mmax < 0 || mmax > BOYS_MAX_M || t < 0) {
         throw std::domain_error("Arguments to Boys function are outside the valid domain.");
     }
-    // Precompute terms in taylor series without coefficients, if needed.
     const int i = static_cast<int>((round(t*BOYS_RESOLUTION)));
-    double xs[6];
-    if (i < (boys_sizes[mmax]-1)) {
-        // The if clause relies on the fact that the size of the pre-computed
-        // Boys function arrays increases with m.
-        const double t_delta = (i - t*BOYS_RESOLUTION)/BOYS_RESOLUTION;
-        xs[0] = t_delta;
-        xs[1] = xs[0]*(t_delta/2.0);
-        xs[2] = xs[1]*(t_delta/3.0);
-        xs[3] = xs[2]*(t_delta/4.0);
-        xs[4] = xs[3]*(t_delta/5.0);
-        xs[5] = xs[4]*(t_delta/6.0);
-    }
-    // Start the computation of the approximation of the Boys function and its
-    // derivative for large values of t, if needed.
-    double tail = NAN;
-    if (i >= (boys_sizes[0]-1)) {
-        tail = SQRT_PI_D2/sqrt(t);
-    }
-    // Compute the Boys function and all the requested derivatives.
-    for (long m=0; m <= mmax; m++) {
-        if (i >= (boys_sizes[m]-1)) {
-            if (m > 0) tail *= 0.5*(2*m-1)/t;
+    if (i >= (boys_sizes[mmax]-1)) {
+        // For large values of t, the asymptotic form is used for all orders. This
+        // relies on the fact that the size of the pre-computed Boys function arrays
+        // increases with m.
+        double tail = SQRT_PI_D2/sqrt(t);
+        output[0] = tail;
+        for (long m=1; m <= mmax; m++) {
+            tail *= 0.5*(2*m-1)/t;
             output[m] = tail;
-        } else {
-            output[m] =
-                boys_fn_data[m][i] +
-                boys_fn_data[m+1][i]*xs[0] +
-                boys_fn_data[m+2][i]*xs[1] +
-                boys_fn_data[m+3][i]*xs[2] +
-                boys_fn_data[m+4][i]*xs[3] +
-                boys_fn_data[m+5][i]*xs[4] +
-                boys_fn_data[m+6][i]*xs[5];
+        }
+        return;
+    }
+    // Only the highest order is interpolated with the Taylor series. This avoids
+    // gathering seven table entries for every order.
+    const double t_delta = (i - t*BOYS_RESOLUTION)/BOYS_RESOLUTION;
+    double tmp = t_delta;
+    double result = boys_fn_data[mmax][i];
+    result += boys_fn_data[mmax+1][i]*tmp;
+    tmp *= t_delta/2.0;
+    result += boys_fn_data[mmax+2][i]*tmp;
+    tmp *= t_delta/3.0;
+    result += boys_fn_data[mmax+3][i]*tmp;
+    tmp *= t_delta/4.0;
+    result += boys_fn_data[mmax+4][i]*tmp;
+    tmp *= t_delta/5.0;
+    result += boys_fn_data[mmax+5][i]*tmp;
+    tmp *= t_delta/6.0;
+    result += boys_fn_data[mmax+6][i]*tmp;
+    output[mmax] = result;
+    // The lower orders follow from the downward recursion, which is numerically
+    // stable: F_m(t) = (2 t F_{m+1}(t) + exp(-t))/(2 m + 1).
+    if (mmax > 0) {
+        const double two_t = 2.0*t;
+        const double exp_t = exp(-t);
+        for (long m=mmax-1; m >= 0; m--) {
+            output[m] = (two_t*output[m+1] + exp_t)/(2*m+1);
         }
     }
 }
@@ -848,6 +848,10 @@ cdef class GOBasis(GBasis):
         .. math::
             v = \frac{1}{r}
 
+        When HORTON is compiled with OpenMP, the shell quartets are distributed over
+        threads. The number of threads can be set with the environment variable
+        ``HORTON_NUM_THREADS`` (or ``OMP_NUM_THREADS``).
+
         Parameters
         ----------
         output
@@ -1117,8 +1121,8 @@ cdef class GOBasis(GBasis):
         output : np.ndarray, shape=(npoint, n), dtype=float
             the output array. (It is allocated when not given.)
         """
-        # Do some type checking
-        cdef double[:, :] coeffs = orb.coeffs
+        # Do some type checking. Single precision coefficients are promoted.
+        cdef double[:, ::1] coeffs = np.ascontiguousarray(orb.coeffs, dtype=float)
         self.check_coeffs(coeffs)
         nfn = coeffs.shape[1]
         check_shape(points, (-1, 3), 'points')
@@ -1154,8 +1158,8 @@ cdef class GOBasis(GBasis):
         output : np.ndarray, shape=(npoint, n, 3), dtype=float
             the output array. (It is allocated when not given.)
         """
-        # Do some type checking
-        cdef double[:, :] coeffs = orb.coeffs
+        # Do some type checking. Single precision coefficients are promoted.
+        cdef double[:, ::1] coeffs = np.ascontiguousarray(orb.coeffs, dtype=float)
         self.check_coeffs(coeffs)
         nfn = coeffs.shape[1]
         check_shape(points, (-1, 3), 'points')
@@ -2253,6 +2257,14 @@ cdef class IterGB4:
     def inc_shell(self):
         return self._this.inc_shell()
 
+    def set_shell(self, long ishell0, long ishell1, long ishell2, long ishell3):
+        nshell = self._gbasis.nshell
+        assert 0 <= ishell0 < nshell
+        assert 0 <= ishell1 < nshell
+        assert 0 <= ishell2 < nshell
+        assert 0 <= ishell3 < nshell
+        self._this.set_shell(ishell0, ishell1, ishell2, ishell3)
+
     def update_shell(self):
         self._this.update_shell()
 
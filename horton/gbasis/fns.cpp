@@ -23,10 +23,12 @@
 #ifdef DEBUG
 #include <cstdio>
 #endif
+#include <algorithm>
 #include <cmath>
 #include <cstdlib>
 #include <cstring>
 #include <stdexcept>
+#include <vector>
 #include "horton/moments.h"
 #include "horton/gbasis/boys.h"
 #include "horton/gbasis/cartpure.h"
@@ -176,6 +178,30 @@ void GB1ExpGridOrbGradientFn::compute_point_from_exp(double* work_basis, double*
 }
 
 
+/*
+    GB1DMGridFn
+*/
+
+void GB1DMGridFn::compute_tile_from_dm(long npoint, double* work_basis, double* dm,
+                                       long nbasis, double* output, double epsilon,
+                                       double* dmmaxrow) {
+  for (long ipoint=0; ipoint < npoint; ipoint++) {
+    compute_point_from_dm(work_basis, dm, nbasis, output, epsilon, dmmaxrow);
+    work_basis += nbasis*dim_work;
+    output += dim_output;
+  }
+}
+
+void GB1DMGridFn::compute_fock_from_tile(long npoint, double* pots, double* work_basis,
+                                         long nbasis, double* fock) {
+  for (long ipoint=0; ipoint < npoint; ipoint++) {
+    compute_fock_from_pot(pots, work_basis, nbasis, fock);
+    work_basis += nbasis*dim_work;
+    pots += dim_output;
+  }
+}
+
+
 /*
     GB1DMGridDensityFn
 */
@@ -417,6 +443,108 @@ void GB1DMGridGGAFn::compute_fock_from_pot(double* pot, double* work_basis, long
   }
 }
 
+/*
+    Copy the work_basis array of a tile, stored as [ipoint][ibasis][iwork], to an
+    array with layout [iwork][ibasis][ipoint]. The innermost loops over the points in
+    the tile then access contiguous memory.
+*/
+static void transpose_tile(long npoint, long nbasis, long dim_work,
+                           const double* work_basis, double* tile) {
+  for (long ipoint=0; ipoint < npoint; ipoint++) {
+    for (long ibasis=0; ibasis < nbasis; ibasis++) {
+      for (long iwork=0; iwork < dim_work; iwork++) {
+        tile[(iwork*nbasis + ibasis)*npoint + ipoint] = *work_basis;
+        work_basis++;
+      }
+    }
+  }
+}
+
+/*
+    Return a work array with at least the given size. It only grows, such that
+    smaller tiles reuse the memory allocated for larger ones.
+*/
+static double* get_tile_buffer(std::vector<double>* buffer, long size) {
+  if (static_cast<long>(buffer->size()) < size) buffer->resize(size);
+  return buffer->data();
+}
+
+void GB1DMGridGGAFn::compute_tile_from_dm(long npoint, double* work_basis, double* dm,
+                                          long nbasis, double* output, double epsilon,
+                                          double* dmmaxrow) {
+  // Same as compute_point_from_dm, but all points in the tile are treated at once,
+  // such that each row of the density matrix is loaded only once for the whole tile.
+  double* tile = get_tile_buffer(&tile_basis, 4*nbasis*npoint);
+  transpose_tile(npoint, nbasis, 4, work_basis, tile);
+  const double* basis = tile;
+  const double* basis_x = basis + nbasis*npoint;
+  const double* basis_y = basis_x + nbasis*npoint;
+  const double* basis_z = basis_y + nbasis*npoint;
+
+  double* row = get_tile_buffer(&tile_work, npoint);
+  for (long ibasis0=0; ibasis0 < nbasis; ibasis0++) {
+    std::fill(row, row + npoint, 0.0);
+    for (long ibasis1=0; ibasis1 < nbasis; ibasis1++) {
+      const double dm_element = dm[ibasis0*nbasis+ibasis1];
+      const double* basis1 = basis + ibasis1*npoint;
+      for (long ipoint=0; ipoint < npoint; ipoint++) {
+        row[ipoint] += dm_element*basis1[ipoint];
+      }
+    }
+    const long offset = ibasis0*npoint;
+    for (long ipoint=0; ipoint < npoint; ipoint++) {
+      output[4*ipoint] += row[ipoint]*basis[offset+ipoint];
+      output[4*ipoint+1] += 2*row[ipoint]*basis_x[offset+ipoint];
+      output[4*ipoint+2] += 2*row[ipoint]*basis_y[offset+ipoint];
+      output[4*ipoint+3] += 2*row[ipoint]*basis_z[offset+ipoint];
+    }
+  }
+}
+
+void GB1DMGridGGAFn::compute_fock_from_tile(long npoint, double* pots, double* work_basis,
+                                            long nbasis, double* fock) {
+  // Same as compute_fock_from_pot, but the contributions from all points in the tile
+  // are summed before a Fock matrix element is updated. The contribution to the Fock
+  // matrix is written as a rank-2k update, F += B A^T + A B^T, where A contains the
+  // basis functions and B = pot[0]*A/2 + pot[1]*A_x + pot[2]*A_y + pot[3]*A_z.
+  double* tile = get_tile_buffer(&tile_basis, 4*nbasis*npoint);
+  transpose_tile(npoint, nbasis, 4, work_basis, tile);
+  const double* basis = tile;
+  const double* basis_x = basis + nbasis*npoint;
+  const double* basis_y = basis_x + nbasis*npoint;
+  const double* basis_z = basis_y + nbasis*npoint;
+
+  double* mixed = get_tile_buffer(&tile_work, nbasis*npoint);
+  for (long ibasis=0; ibasis < nbasis; ibasis++) {
+    const long offset = ibasis*npoint;
+    for (long ipoint=0; ipoint < npoint; ipoint++) {
+      const double* pot = pots + 4*ipoint;
+      mixed[offset+ipoint] = 0.5*pot[0]*basis[offset+ipoint] +
+                             pot[1]*basis_x[offset+ipoint] +
+                             pot[2]*basis_y[offset+ipoint] +
+                             pot[3]*basis_z[offset+ipoint];
+    }
+  }
+
+  for (long ibasis0=0; ibasis0 < nbasis; ibasis0++) {
+    const double* basis0 = basis + ibasis0*npoint;
+    const double* mixed0 = mixed + ibasis0*npoint;
+    for (long ibasis1=0; ibasis1 <= ibasis0; ibasis1++) {
+      const double* basis1 = basis + ibasis1*npoint;
+      const double* mixed1 = mixed + ibasis1*npoint;
+      double result = 0;
+      for (long ipoint=0; ipoint < npoint; ipoint++) {
+        result += mixed0[ipoint]*basis1[ipoint] + basis0[ipoint]*mixed1[ipoint];
+      }
+      fock[ibasis1*nbasis+ibasis0] += result;
+      if (ibasis1 != ibasis0) {
+        // Enforce symmetry
+        fock[ibasis0*nbasis+ibasis1] += result;
+      }
+    }
+  }
+}
+
 
 /*
     GB1DMGridKineticFn
@@ -119,6 +119,8 @@
 #ifndef HORTON_GBASIS_FNS_H_
 #define HORTON_GBASIS_FNS_H_
 
+#include <vector>
+
 #include "horton/gbasis/calc.h"
 #include "horton/gbasis/common.h"
 #include "horton/gbasis/iter_pow.h"
@@ -409,6 +411,73 @@ class GB1DMGridFn : public GB1GridFn  {
     */
   virtual void compute_fock_from_pot(double* pot, double* work_basis, long nbasis,
                                      double* fock) = 0;
+
+  /** @brief
+        Compute the final results on a tile of grid points.
+
+      The default implementation calls compute_point_from_dm for every point.
+      Subclasses may override this to reuse each row of the density matrix for all
+      points in the tile.
+
+      @param npoint
+        The number of grid points in the tile.
+
+      @param work_basis
+        Properties of basis functions computed for all points in the tile, stored as
+        consecutive blocks for each point. (size=npoint*nbasis*dim_work)
+
+      @param dm
+        The coefficients of the first-order density matrix. (size=nbasis*nbasis)
+
+      @param nbasis
+        The number of basis functions.
+
+      @param output
+        The output array for the points in the tile. (size=npoint*dim_output)
+
+      @param epsilon
+        A cutoff value used to discard small contributions.
+
+      @param dmmaxrow
+        The maximum value of the density matrix on each row. (size=nbasis)
+    */
+  virtual void compute_tile_from_dm(long npoint, double* work_basis, double* dm,
+                                    long nbasis, double* output, double epsilon,
+                                    double* dmmaxrow);
+
+  /** @brief
+        Add contributions to the Fock matrix from a tile of grid points.
+
+      The default implementation calls compute_fock_from_pot for every point.
+      Subclasses may override this to update each Fock matrix element only once per
+      tile.
+
+      @param npoint
+        The number of grid points in the tile.
+
+      @param pots
+        The potential at all points in the tile. (size=npoint*dim_output)
+
+      @param work_basis
+        Properties of the orbital basis at all points in the tile, stored as consecutive
+        blocks for each point. (size=npoint*nbasis*dim_work)
+
+      @param nbasis
+        The number of basis functions.
+
+      @param fock
+        The Fock matrix to which the result will be added. (size=nbasis*nbasis)
+    */
+  virtual void compute_fock_from_tile(long npoint, double* pots, double* work_basis,
+                                      long nbasis, double* fock);
+
+  /** @brief
+          Create a new object of the same type and with the same parameters.
+
+      This is used to give each thread its own work arrays when grid functions are
+      evaluated in parallel. The caller is responsible for deleting the result.
+    */
+  virtual GB1DMGridFn* clone() const = 0;
 };
 
 
@@ -448,6 +517,11 @@ class GB1DMGridDensityFn : public GB1DMGridFn  {
   virtual void compute_fock_from_pot(double* pot, double* work_basis, long nbasis,
                                      double* fock);
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB1DMGridFn* clone() const {
+    return new GB1DMGridDensityFn(get_max_shell_type());
+  }
+
  private:
   double poly_work[MAX_NCART_CUMUL];  //!< Work array with Cartesian polynomials.
   long offset;  //!< Offset for the polynomials for the density
@@ -510,6 +584,11 @@ class GB1DMGridGradientFn : public GB1DMGridFn  {
   virtual void compute_fock_from_pot(double* pot, double* work_basis, long nbasis,
                                      double* fock);
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB1DMGridFn* clone() const {
+    return new GB1DMGridGradientFn(get_max_shell_type());
+  }
+
  protected:
   double poly_work[MAX_NCART_CUMUL_D];  //!< Work array with Cartesian polynomials.
   long offset;     //!< Offset for the polynomials for the density
@@ -549,6 +628,27 @@ class GB1DMGridGGAFn : public GB1DMGridGradientFn  {
   //! Add contribution to Fock matrix for one grid point. (See base class for details.)
   virtual void compute_fock_from_pot(double* pot, double* work_basis, long nbasis,
                                      double* fock);
+
+  //! Compute the final results on a tile of grid points. (See base class for details.)
+  virtual void compute_tile_from_dm(long npoint, double* work_basis, double* dm,
+                                    long nbasis, double* output, double epsilon,
+                                    double* dmmaxrow);
+
+  //! Add contributions to Fock matrix from a tile of points. (See base class for details.)
+  virtual void compute_fock_from_tile(long npoint, double* pots, double* work_basis,
+                                      long nbasis, double* fock);
+
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB1DMGridFn* clone() const {
+    return new GB1DMGridGGAFn(get_max_shell_type());
+  }
+
+ private:
+  // Work arrays for the tile functions. They grow to the size of the largest tile
+  // and are then reused, such that they are allocated only once per thread. (Every
+  // thread works with its own clone.)
+  std::vector<double> tile_basis;  //!< Transposed basis functions of a tile.
+  std::vector<double> tile_work;   //!< A row of the density or the mixed basis.
 };
 
 
@@ -591,6 +691,11 @@ class GB1DMGridKineticFn : public GB1DMGridFn  {
   virtual void compute_fock_from_pot(double* pot, double* work_basis, long nbasis,
                                      double* fock);
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB1DMGridFn* clone() const {
+    return new GB1DMGridKineticFn(get_max_shell_type());
+  }
+
  private:
   double poly_work[MAX_NCART_CUMUL_D];  //!< Work array with Cartesian polynomials.
   long offset;     //!< Offset for the polynomials for the density.
@@ -650,6 +755,11 @@ class GB1DMGridHessianFn : public GB1DMGridFn  {
   virtual void compute_fock_from_pot(double* pot, double* work_basis, long nbasis,
                                      double* fock);
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB1DMGridFn* clone() const {
+    return new GB1DMGridHessianFn(get_max_shell_type());
+  }
+
  private:
   double poly_work[MAX_NCART_CUMUL_DD];  //!< Work array with Cartesian polynomials.
   long offset;     //!< Offset for the polynomials for the density.
@@ -707,6 +817,11 @@ class GB1DMGridMGGAFn : public GB1DMGridFn  {
   virtual void compute_fock_from_pot(double* pot, double* work_basis, long nbasis,
                                      double* fock);
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB1DMGridFn* clone() const {
+    return new GB1DMGridMGGAFn(get_max_shell_type());
+  }
+
  private:
   double poly_work[MAX_NCART_CUMUL_DD];  //!< Work array with Cartesian polynomials.
   long offset;     //!< Offset for the polynomials for the density.
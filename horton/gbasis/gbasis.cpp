@@ -28,6 +28,10 @@
 #include <stdexcept>
 #include <cstdlib>
 #include <cstring>
+#include <algorithm>
+#include <memory>
+#include <vector>
+#include "horton/openmp.h"
 #include "horton/gbasis/gbasis.h"
 #include "horton/gbasis/common.h"
 #include "horton/gbasis/iter_gb.h"
@@ -50,6 +54,53 @@ const double gob_pure_normalization(const double alpha, const long l) {
            /fac2(2*l-1));
 }
 
+
+/*
+    A canonical combination of four shells and an estimate of the cost to compute
+    all integrals for this combination. This is used to distribute the work over
+    threads in GBasis::compute_four_index.
+*/
+
+struct ShellQuartet {
+    long ishell0, ishell1, ishell2, ishell3;
+    long cost;
+};
+
+
+static bool more_expensive(const ShellQuartet& q0, const ShellQuartet& q1) {
+    return q0.cost > q1.cost;
+}
+
+
+/*
+    Grid points are distributed over threads in blocks of this size. It is large
+    enough to amortize the scheduling overhead and small enough to balance the
+    load when the cost per point varies, e.g. for points far from all atoms.
+*/
+
+static const long GRID_BLOCK_SIZE = 1024;
+
+
+/*
+    Within a block, the basis functions are evaluated for a tile of grid points at
+    once, stored as work_basis[ipoint][ibasis][iwork]. The tile is as large as
+    possible (at most GRID_TILE_SIZE points), while still taking at most half of a
+    (typical) L2 cache of GRID_TILE_CACHE bytes. This way, the density matrix or
+    Fock matrix only needs to be streamed once for all points in a tile.
+*/
+
+static const long GRID_TILE_SIZE = 256;
+static const long GRID_TILE_CACHE = 262144;
+
+
+static long get_tile_size(long nwork) {
+    long ntile = GRID_TILE_CACHE/(2*sizeof(double)*nwork);
+    if (ntile > GRID_TILE_SIZE) return GRID_TILE_SIZE;
+    if (ntile < 1) return 1;
+    return ntile;
+}
+
+
 /*
     GBasis
 
@@ -162,19 +213,74 @@ void GBasis::compute_two_index(double* output, GB2Integral* integral) {
 }
 
 void GBasis::compute_four_index(double* output, GB4Integral* integral) {
-    IterGB4 iter = IterGB4(this);
-    iter.update_shell();
-    do {
-        integral->reset(iter.shell_type0, iter.shell_type1, iter.shell_type2, iter.shell_type3,
-                        iter.r0, iter.r1, iter.r2, iter.r3);
-        iter.update_prim();
+    // Make a list of all canonical shell quartets, i.e. the ones visited by
+    // IterGB4::inc_shell. The cost of each quartet is estimated as the number of
+    // primitive quartets times the number of Cartesian functions.
+    std::vector<ShellQuartet> quartets;
+    {
+        IterGB4 iter = IterGB4(this);
+        iter.update_shell();
         do {
-            integral->add(iter.con_coeff, iter.alpha0, iter.alpha1, iter.alpha2, iter.alpha3,
-                          iter.scales0, iter.scales1, iter.scales2, iter.scales3);
-        } while (iter.inc_prim());
-        integral->cart_to_pure();
-        iter.store(integral->get_work(), output);
-    } while (iter.inc_shell());
+            ShellQuartet q;
+            q.ishell0 = iter.ishell0;
+            q.ishell1 = iter.ishell1;
+            q.ishell2 = iter.ishell2;
+            q.ishell3 = iter.ishell3;
+            q.cost = iter.nprim0*iter.nprim1*iter.nprim2*iter.nprim3*
+                     get_shell_nbasis(abs(iter.shell_type0))*
+                     get_shell_nbasis(abs(iter.shell_type1))*
+                     get_shell_nbasis(abs(iter.shell_type2))*
+                     get_shell_nbasis(abs(iter.shell_type3));
+            quartets.push_back(q);
+        } while (iter.inc_shell());
+    }
+    // The most expensive quartets are handed out first, such that the cheap
+    // ones can fill the gaps at the end. This gives a good load balance.
+    std::stable_sort(quartets.begin(), quartets.end(), more_expensive);
+    const long nquartet = quartets.size();
+
+    // Each canonical quartet writes to a different set of elements in the output
+    // array, so the threads never write to the same memory locations. Every thread
+    // works with its own copy of the integral object because of the work arrays.
+    // Exceptions are caught inside the parallel region and rethrown afterwards.
+    ThreadExceptions errors;
+#pragma omp parallel num_threads(get_num_threads()) if (nquartet > 1)
+    {
+        std::unique_ptr<GB4Integral> thread_clone;
+        GB4Integral* thread_integral = integral;
+#ifdef _OPENMP
+        if (omp_get_thread_num() > 0) {
+            try {
+                thread_clone.reset(integral->clone());
+                thread_integral = thread_clone.get();
+            } catch (...) {
+                errors.store();
+            }
+        }
+#endif
+        IterGB4 iter = IterGB4(this);
+#pragma omp for schedule(dynamic, 1)
+        for (long iquartet=0; iquartet < nquartet; iquartet++) {
+            if (errors.failed()) continue;
+            try {
+                const ShellQuartet& q = quartets[iquartet];
+                iter.set_shell(q.ishell0, q.ishell1, q.ishell2, q.ishell3);
+                thread_integral->reset(iter.shell_type0, iter.shell_type1, iter.shell_type2,
+                                       iter.shell_type3, iter.r0, iter.r1, iter.r2, iter.r3);
+                iter.update_prim();
+                do {
+                    thread_integral->add(iter.con_coeff, iter.alpha0, iter.alpha1, iter.alpha2,
+                                         iter.alpha3, iter.scales0, iter.scales1, iter.scales2,
+                                         iter.scales3);
+                } while (iter.inc_prim());
+                thread_integral->cart_to_pure();
+                iter.store(thread_integral->get_work(), output);
+            } catch (...) {
+                errors.store();
+            }
+        }
+    }
+    errors.rethrow();
 }
 
 void GBasis::compute_grid_point1(double* output, double* point, GB1GridFn* grid_fn) {
@@ -338,33 +444,69 @@ void GOBasis::compute_grid1_grad_exp(long nfn, double* coeffs, long npoint,
 void GOBasis::compute_grid1_dm(double* dm, long npoint, double* points,
                                GB1DMGridFn* grid_fn, double* output,
                                double epsilon, double* dmmaxrow) {
-    // The work array contains the basis functions evaluated at the grid point,
-    // and optionally some of its derivatives.
+    // The work array contains the basis functions evaluated at a tile of grid
+    // points, and optionally some of its derivatives.
     long nwork = get_nbasis()*grid_fn->get_dim_work();
     long dim_output = grid_fn->get_dim_output();
-    double* work_basis = new double[nwork];
-
-    for (long ipoint=0; ipoint < npoint; ipoint++) {
-        // A) clear the basis functions.
-        memset(work_basis, 0, nwork*sizeof(double));
+    long ntile = get_tile_size(nwork);
+    long nblock = (npoint + GRID_BLOCK_SIZE - 1)/GRID_BLOCK_SIZE;
+
+    // Every grid point has its own output, so threads never write to the same
+    // memory locations. Each thread has its own work arrays and grid_fn.
+    // Exceptions are caught inside the parallel region and rethrown afterwards.
+    ThreadExceptions errors;
+#pragma omp parallel num_threads(get_num_threads()) if (nblock > 1)
+    {
+        std::unique_ptr<GB1DMGridFn> thread_clone;
+        GB1DMGridFn* thread_grid_fn = grid_fn;
+        std::vector<double> work_basis;
+        try {
+#ifdef _OPENMP
+            if (omp_get_thread_num() > 0) {
+                thread_clone.reset(grid_fn->clone());
+                thread_grid_fn = thread_clone.get();
+            }
+#endif
+            work_basis.resize(ntile*nwork);
+        } catch (...) {
+            errors.store();
+        }
 
-        // B) evaluate the basis functions in the current point.
-        compute_grid_point1(work_basis, points, grid_fn);
+#pragma omp for schedule(dynamic, 1)
+        for (long iblock=0; iblock < nblock; iblock++) {
+            if (errors.failed()) continue;
+            try {
+                long block_end = std::min((iblock + 1)*GRID_BLOCK_SIZE, npoint);
+                for (long begin=iblock*GRID_BLOCK_SIZE; begin < block_end; begin += ntile) {
+                    long end = std::min(begin + ntile, block_end);
+
+                    // A) clear the basis functions.
+                    memset(&work_basis[0], 0, (end - begin)*nwork*sizeof(double));
+
+                    // B) evaluate the basis functions in all points of the tile.
+                    for (long ipoint=begin; ipoint < end; ipoint++) {
+                        compute_grid_point1(&work_basis[(ipoint - begin)*nwork],
+                                            points + 3*ipoint, thread_grid_fn);
+                    }
 #ifdef DEBUG
-        for (int i=0; i<nwork; i++) printf("%f ", work_basis[i]);
-        printf("\n");
+                    for (int i=0; i<(end - begin)*nwork; i++) printf("%f ", work_basis[i]);
+                    printf("\n");
 #endif
 
-        // C) Use the basis function results and the density matrix to evaluate
-        // the function at the grid point. The result is added to the output.
-        grid_fn->compute_point_from_dm(work_basis, dm, get_nbasis(), output, epsilon, dmmaxrow);
-
-        // D) Prepare for next iteration
-        output += dim_output;
-        points += 3;
+                    // C) Use the basis function results and the density matrix to
+                    // evaluate the function in the points of the tile. The result is
+                    // added to the output.
+                    thread_grid_fn->compute_tile_from_dm(end - begin, &work_basis[0], dm,
+                                                         get_nbasis(),
+                                                         output + dim_output*begin,
+                                                         epsilon, dmmaxrow);
+                }
+            } catch (...) {
+                errors.store();
+            }
+        }
     }
-
-    delete[] work_basis;
+    errors.rethrow();
 }
 
 void GOBasis::compute_grid2_dm(double* dm, long npoint, double* points, double* output) {
@@ -381,32 +523,104 @@ void GOBasis::compute_grid2_dm(double* dm, long npoint, double* points, double*
 }
 
 void GOBasis::compute_grid1_fock(long npoint, double* points, double* weights, long pot_stride, double* pots, GB1DMGridFn* grid_fn, double* output) {
-    // The work array contains the basis functions evaluated at the grid point,
-    // and optionally some of its derivatives.
+    // The work array contains the basis functions evaluated at a tile of grid
+    // points, and optionally some of its derivatives.
     long nwork = get_nbasis()*grid_fn->get_dim_work();
-    double* work_basis = new double[nwork];
     long dim_output = grid_fn->get_dim_output();
-    double* work_pot = new double[dim_output];
-
-    for (long ipoint=0; ipoint < npoint; ipoint++) {
-        // A) clear the work array.
-        memset(work_basis, 0, nwork*sizeof(double));
+    long ntile = get_tile_size(nwork);
+    long nfock = get_nbasis()*get_nbasis();
+    long nblock = (npoint + GRID_BLOCK_SIZE - 1)/GRID_BLOCK_SIZE;
+
+    // All grid points contribute to the same Fock matrix. When running in
+    // parallel, the first thread adds its contributions directly to the output and
+    // every other thread accumulates in a private Fock matrix. This avoids atomic
+    // updates in the inner loops, at the cost of (nthread - 1)*nbasis**2 doubles of
+    // extra memory. After the loop, each thread adds one slice of all private Fock
+    // matrices to the output. Exceptions are caught inside the parallel region and
+    // rethrown afterwards.
+    ThreadExceptions errors;
+    std::vector<std::vector<double> > thread_outputs;
+#pragma omp parallel num_threads(get_num_threads()) if (nblock > 1)
+    {
+        int ithread = 0;
+        int nthread = 1;
+#ifdef _OPENMP
+        ithread = omp_get_thread_num();
+        nthread = omp_get_num_threads();
+#endif
+#pragma omp single
+        {
+            try {
+                thread_outputs.resize(nthread);
+            } catch (...) {
+                errors.store();
+            }
+        }
 
-        // B) evaluate the basis functions in the current point.
-        compute_grid_point1(work_basis, points, grid_fn);
+        std::unique_ptr<GB1DMGridFn> thread_clone;
+        GB1DMGridFn* thread_grid_fn = grid_fn;
+        double* thread_output = output;
+        std::vector<double> work_basis;
+        std::vector<double> work_pot;
+        if (!errors.failed()) {
+            try {
+                if (ithread > 0) {
+                    thread_clone.reset(grid_fn->clone());
+                    thread_grid_fn = thread_clone.get();
+                    thread_outputs[ithread].assign(nfock, 0.0);
+                    thread_output = &thread_outputs[ithread][0];
+                }
+                work_basis.resize(ntile*nwork);
+                work_pot.resize(ntile*dim_output);
+            } catch (...) {
+                errors.store();
+            }
+        }
 
-        // C) Add the contribution from this grid point to the operator
-        for (long i=dim_output-1; i >= 0; i--) {
-            work_pot[i] = (*weights)*pots[i];
+#pragma omp for schedule(dynamic, 1)
+        for (long iblock=0; iblock < nblock; iblock++) {
+            if (errors.failed()) continue;
+            try {
+                long block_end = std::min((iblock + 1)*GRID_BLOCK_SIZE, npoint);
+                for (long begin=iblock*GRID_BLOCK_SIZE; begin < block_end; begin += ntile) {
+                    long end = std::min(begin + ntile, block_end);
+
+                    // A) clear the work array.
+                    memset(&work_basis[0], 0, (end - begin)*nwork*sizeof(double));
+
+                    for (long ipoint=begin; ipoint < end; ipoint++) {
+                        // B) evaluate the basis functions in the current point.
+                        compute_grid_point1(&work_basis[(ipoint - begin)*nwork],
+                                            points + 3*ipoint, thread_grid_fn);
+
+                        // C) Multiply the potential with the integration weight.
+                        double* point_pot = &work_pot[(ipoint - begin)*dim_output];
+                        for (long i=dim_output-1; i >= 0; i--) {
+                            point_pot[i] = weights[ipoint]*pots[pot_stride*ipoint + i];
+                        }
+                    }
+
+                    // D) Add the contribution from this tile to the operator
+                    thread_grid_fn->compute_fock_from_tile(end - begin, &work_pot[0],
+                                                           &work_basis[0], get_nbasis(),
+                                                           thread_output);
+                }
+            } catch (...) {
+                errors.store();
+            }
         }
-        grid_fn->compute_fock_from_pot(work_pot, work_basis, get_nbasis(), output);
 
-        // D) Prepare for next iteration
-        points += 3;
-        weights++;
-        pots += pot_stride;
+        // E) Reduction of the private Fock matrices. The implicit barrier at the end
+        // of the loop guarantees that all of them are complete. Every thread owns a
+        // different slice of the output.
+        if (!errors.failed()) {
+            long begin = (nfock*ithread)/nthread;
+            long end = (nfock*(ithread + 1))/nthread;
+            for (long jthread=1; jthread < nthread; jthread++) {
+                const double* other = &thread_outputs[jthread][0];
+                for (long i=begin; i < end; i++) output[i] += other[i];
+            }
+        }
     }
-
-    delete[] work_basis;
-    delete[] work_pot;
+    errors.rethrow();
 }
@@ -60,13 +60,13 @@ cdef extern from "horton/gbasis/gbasis.h":
         void compute_erf_attraction(double* charges, double* centers, long ncharge, double* output, double mu)
         void compute_gauss_attraction(double* charges, double* centers, long ncharge, double* output, double c, double alpha)
         void compute_multipole_moment(long* xyz, double* center, double* output)
-        void compute_electron_repulsion(double* output)
-        void compute_erf_repulsion(double* output, double mu)
-        void compute_gauss_repulsion(double* output, double c, double alpha)
-        void compute_ralpha_repulsion(double* output, double alpha)
+        void compute_electron_repulsion(double* output) except +
+        void compute_erf_repulsion(double* output, double mu) except +
+        void compute_gauss_repulsion(double* output, double c, double alpha) except +
+        void compute_ralpha_repulsion(double* output, double alpha) except +
 
         void compute_grid1_exp(long nfn, double* coeffs, long npoint, double* points, long norb, long* iorbs, double* output)
         void compute_grid1_grad_exp(long nfn, double* coeffs, long npoint, double* points, long norb, long* iorbs, double* output)
-        void compute_grid1_dm(double* dm, long npoint, double* points, fns.GB1DMGridFn* grid_fn, double* output, double epsilon, double* dmmaxrow)
+        void compute_grid1_dm(double* dm, long npoint, double* points, fns.GB1DMGridFn* grid_fn, double* output, double epsilon, double* dmmaxrow) except +
         void compute_grid2_dm(double* dm, long npoint, double* points, double* output)
-        void compute_grid1_fock(long npoint, double* points, double* weights, long pot_stride, double* pots, fns.GB1DMGridFn* grid_fn, double* output)
+        void compute_grid1_fock(long npoint, double* points, double* weights, long pot_stride, double* pots, fns.GB1DMGridFn* grid_fn, double* output) except +
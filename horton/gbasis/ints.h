@@ -399,6 +399,14 @@ class GB4Integral : public GBCalculator {
   //! Transform the results in the work array from Cartesian to pure functions where needed.
   void cart_to_pure();
 
+  /** @brief
+          Create a new object of the same type and with the same parameters.
+
+      This is used to give each thread its own work arrays when four-center integrals
+      are computed in parallel. The caller is responsible for deleting the result.
+    */
+  virtual GB4Integral* clone() const = 0;
+
   const long get_shell_type0() const {return shell_type0;}  //!< Shell type of contraction 0
   const long get_shell_type1() const {return shell_type1;}  //!< Shell type of contraction 1
   const long get_shell_type2() const {return shell_type2;}  //!< Shell type of contraction 2
@@ -520,6 +528,11 @@ class GB4ElectronRepulsionIntegralLibInt : public GB4IntegralLibInt {
     */
   virtual void laplace_of_potential(double prefac, double rho, double t, long mmax,
                                     double* output);
+
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB4Integral* clone() const {
+    return new GB4ElectronRepulsionIntegralLibInt(get_max_shell_type());
+  }
 };
 
 
@@ -554,6 +567,11 @@ class GB4ErfIntegralLibInt : public GB4IntegralLibInt {
 
   const double get_mu() const {return mu;}  //!< The range-separation parameter.
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB4Integral* clone() const {
+    return new GB4ErfIntegralLibInt(get_max_shell_type(), mu);
+  }
+
  private:
   double mu;  //!< The range-separation parameter.
 };
@@ -603,6 +621,11 @@ class GB4GaussIntegralLibInt : public GB4IntegralLibInt {
   const double get_c() const {return c;}  //!< Coefficient of the gaussian.
   const double get_alpha() const {return alpha;}  //!< Exponential parameter of the gaussian.
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB4Integral* clone() const {
+    return new GB4GaussIntegralLibInt(get_max_shell_type(), c, alpha);
+  }
+
  private:
   double c;  //!< Coefficient of the gaussian.
   double alpha;  //!< Exponential parameter of the gaussian.
@@ -639,6 +662,11 @@ class GB4RAlphaIntegralLibInt : public GB4IntegralLibInt {
 
   const double get_alpha() const {return alpha;}  //!< The power of r.
 
+  //! Create a copy with the same parameters. See base class for details.
+  virtual GB4Integral* clone() const {
+    return new GB4RAlphaIntegralLibInt(get_max_shell_type(), alpha);
+  }
+
  private:
   double alpha;  //!< The power of r.
 };
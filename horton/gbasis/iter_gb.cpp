@@ -331,6 +331,22 @@ int IterGB4::inc_shell() {
 }
 
 
+void IterGB4::set_shell(long _ishell0, long _ishell1, long _ishell2, long _ishell3) {
+    // Jump to an arbitrary combination of shells, e.g. when the shell quartets
+    // are not processed in the order of inc_shell.
+    const long* prim_offsets = gbasis->get_prim_offsets();
+    ishell0 = _ishell0;
+    ishell1 = _ishell1;
+    ishell2 = _ishell2;
+    ishell3 = _ishell3;
+    oprim0 = prim_offsets[ishell0];
+    oprim1 = prim_offsets[ishell1];
+    oprim2 = prim_offsets[ishell2];
+    oprim3 = prim_offsets[ishell3];
+    update_shell();
+}
+
+
 void IterGB4::update_shell() {
     // Update fields that depend on shell and related counters.
     nprim0 = gbasis->nprims[ishell0];
@@ -91,6 +91,7 @@ class IterGB4 {
         IterGB4(GBasis* gbasis);
 
         int inc_shell();
+        void set_shell(long ishell0, long ishell1, long ishell2, long ishell3);
         void update_shell();
         int inc_prim();
         void update_prim();
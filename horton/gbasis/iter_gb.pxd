@@ -69,6 +69,7 @@ cdef extern from "horton/gbasis/iter_gb.h":
         IterGB4(gbasis.GBasis* gbasis)
 
         bint inc_shell()
+        void set_shell(long ishell0, long ishell1, long ishell2, long ishell3)
         void update_shell()
         bint inc_prim()
         void update_prim()
@@ -520,8 +520,12 @@ def test_boys_domain_error():
 
 
 def test_boys_array():
+    # The lower orders are computed with a downward recursion, so the results
+    # are only equal up to rounding errors. Close to the switch to the asymptotic
+    # form, boys_function has tiny absolute errors for the higher orders.
     for mmax in range(get_max_shell_type() * 4 + 1):
         for t in np.random.uniform(0, 200, 500):
             output = boys_function_array(mmax, t)
             for m in range(mmax + 1):
-                assert output[m] == boys_function(m, t)
+                expected = boys_function(m, t)
+                assert abs(output[m] - expected) < 1e-14*expected + 1e-17
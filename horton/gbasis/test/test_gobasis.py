@@ -496,6 +496,21 @@ def test_gobasis_output_args_grid_orbitals_exp():
     assert (orbs1 == orbs2).all()
 
 
+def test_gobasis_grid_orbitals_exp_float32():
+    mol = IOData.from_file(context.get_fn('test/water_hfs_321g.fchk'))
+    points = np.random.uniform(-5, 5, (100, 3))
+    iorbs = np.array([2, 3])
+    orb32 = Orbitals(mol.orb_alpha.nbasis, mol.orb_alpha.nfn, np.float32)
+    orb32.assign(mol.orb_alpha)
+    orbs32 = mol.obasis.compute_grid_orbitals_exp(orb32, points, iorbs)
+    orbs64 = mol.obasis.compute_grid_orbitals_exp(mol.orb_alpha, points, iorbs)
+    assert orbs32.dtype == np.float64
+    np.testing.assert_allclose(orbs32, orbs64, rtol=1e-5, atol=1e-6)
+    grads32 = mol.obasis.compute_grid_orb_gradient_exp(orb32, points, iorbs)
+    grads64 = mol.obasis.compute_grid_orb_gradient_exp(mol.orb_alpha, points, iorbs)
+    np.testing.assert_allclose(grads32, grads64, rtol=1e-5, atol=1e-6)
+
+
 def test_gobasis_output_args_grid_density_dm():
     mol = IOData.from_file(context.get_fn('test/water_hfs_321g.fchk'))
     points = np.random.uniform(-5, 5, (100, 3))
@@ -642,6 +642,22 @@ def test_itergb4_inc_shell():
     check_fields(2, 1, 2, 1)
 
 
+def test_itergb4_set_shell():
+    i4, gobasis = get_itergb4()
+    other = IterGB4(gobasis)
+    i4.update_shell()
+    i4.update_prim()
+    while True:
+        is0, is1, is2, is3 = i4.private_fields[:4]
+        other.set_shell(is0, is1, is2, is3)
+        other.update_prim()
+        assert other.private_fields == i4.private_fields
+        assert other.public_fields == i4.public_fields
+        if not i4.inc_shell():
+            break
+        i4.update_prim()
+
+
 def test_itergb4_inc_prim():
     i4, gobasis = get_itergb4()
     oprims = np.zeros(gobasis.nshell, int)
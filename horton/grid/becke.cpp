@@ -27,6 +27,7 @@
 #include <cmath>
 #include <stdexcept>
 
+#include "horton/openmp.h"
 #include "horton/grid/becke.h"
 
 
@@ -82,9 +83,6 @@ static double dist(double* p0, double* p1) {
 void becke_helper_atom(int npoint, double* points, double* weights, int natom,
                        double* radii, double* centers, int select, int order)
 {
-    double nom, denom; // The nominator and the denominator in the weight definition
-    double p, s; // Used to build up the value of the switching function
-
     // precompute the the alpha parameters for each atom pair
     double alphas[(natom*(natom+1))/2];
     long offset = 0;
@@ -115,16 +113,19 @@ void becke_helper_atom(int npoint, double* points, double* weights, int natom,
         }
     }
 
-    // actual computations of Becke weights
+    // actual computations of Becke weights, the grid points are independent.
+#pragma omp parallel for schedule(static) num_threads(get_num_threads()) if (npoint > 1024)
     for (int ipoint = npoint-1; ipoint>=0; ipoint--) {
-        nom = 0;
-        denom = 0;
+        double* point = &points[3*ipoint];
+        double nom = 0; // The nominator in the weight definition
+        double denom = 0; // The denominator in the weight definition
         for (int iatom0 = 0; iatom0 < natom; iatom0++) {
-            p = 1;
+            double p = 1; // Used to build up the value of the switching function
             for (int iatom1 = 0; iatom1 < natom; iatom1++) {
                 if (iatom0 == iatom1) continue;
 
                 // compute offset for alpha and interatomic distance
+                long offset;
                 if (iatom0 < iatom1) {
                     offset = (iatom1*(iatom1+1))/2+iatom0;
                 } else {
@@ -132,8 +133,8 @@ void becke_helper_atom(int npoint, double* points, double* weights, int natom,
                 }
 
                 // Diatomic switching function
-                s = (dist(points, &centers[3*iatom0])
-                     -dist(points, &centers[3*iatom1]))
+                double s = (dist(point, &centers[3*iatom0])
+                            -dist(point, &centers[3*iatom1]))
                     /atomic_dists[offset]; // Eq. (11)
                 s = s + alphas[offset]*(1 - 2*(iatom0<iatom1))*(1-s*s); // Eq. (A2)
 
@@ -156,10 +157,6 @@ void becke_helper_atom(int npoint, double* points, double* weights, int natom,
 #endif
 
         // Weight function at this grid point:
-        *weights *= nom/denom; // Eq. (22)
-
-        // go to next point
-        points += 3;
-        weights++;
+        weights[ipoint] *= nom/denom; // Eq. (22)
     }
 }
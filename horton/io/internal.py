@@ -28,6 +28,20 @@ from horton.io.lockedh5 import LockedH5File
 __all__ = ['load_h5', 'dump_h5']
 
 
+# Classes used in HDF5 files, looked up by name. This is filled in when a class name is
+# encountered for the first time.
+_classes = {}
+
+
+def _get_class(class_name):
+    '''Return the HORTON class with the given name'''
+    cls = _classes.get(class_name)
+    if cls is None:
+        cls = __import__('horton', fromlist=[class_name]).__dict__[class_name]
+        _classes[class_name] = cls
+    return cls
+
+
 def load_h5(item):
     '''Load a (HORTON) object from an h5py File/Group
 
@@ -56,11 +70,10 @@ def load_h5(item):
                 result[key] = load_h5(subitem)
             return result
         else:
-            # special constructor. the class is found with the imp module
+            # special constructor. the class is found in the horton package.
             if type(class_name) is bytes or type(class_name) is np.bytes_:
                 class_name = class_name.decode("utf-8")
-            cls = __import__('horton', fromlist=[class_name]).__dict__[class_name]
-            return cls.from_hdf5(item)
+            return _get_class(class_name).from_hdf5(item)
 
 
 def dump_h5(grp, data):
@@ -327,13 +327,15 @@ class IOData(object):
         # Apply changes in atomic orbital basis order
         permutation = result.get('permutation')
         if permutation is not None:
+            # Permute all axes with a single fancy-indexing operation, which avoids
+            # one temporary copy per axis.
             for name in cls.two_index_names:
                 value = result.get(name)
                 if value is not None:
-                    value[:] = value[permutation][:, permutation]
+                    value[:] = value[np.ix_(permutation, permutation)]
             er = result.get('er')
             if er is not None:
-                er[:] = er[permutation][:, permutation][:,:, permutation][:,:,:, permutation]
+                er[:] = er[np.ix_(permutation, permutation, permutation, permutation)]
             orb_alpha = result.get('orb_alpha')
             if orb_alpha is not None:
                 orb_alpha.permute_basis(permutation)
@@ -431,10 +433,17 @@ class IOData(object):
         elif hasattr(self, 'dm_full_scf'):
             return self.dm_full_scf
         elif hasattr(self, 'orb_alpha'):
-            dm_full = self.orb_alpha.to_dm()
             if hasattr(self, 'orb_beta'):
+                if _same_coeffs(self.orb_alpha, self.orb_beta):
+                    # Restricted open-shell case: one product with the summed
+                    # occupation numbers instead of two density matrices.
+                    return _dm_from_occupations(
+                        self.orb_alpha.coeffs,
+                        self.orb_alpha.occupations + self.orb_beta.occupations)
+                dm_full = self.orb_alpha.to_dm()
                 dm_full += self.orb_beta.to_dm()
             else:
+                dm_full = self.orb_alpha.to_dm()
                 dm_full *= 2
             return dm_full
 
@@ -453,4 +462,28 @@ class IOData(object):
         elif hasattr(self, 'dm_spin_scf'):
             return self.dm_spin_scf
         elif hasattr(self, 'orb_alpha') and hasattr(self, 'orb_beta'):
+            if _same_coeffs(self.orb_alpha, self.orb_beta):
+                # Restricted open-shell case: only orbitals with different alpha and
+                # beta occupations contribute. No matrix product is needed when all
+                # occupations are equal.
+                return _dm_from_occupations(
+                    self.orb_alpha.coeffs,
+                    self.orb_alpha.occupations - self.orb_beta.occupations)
             return self.orb_alpha.to_dm() - self.orb_beta.to_dm()
+
+
+def _same_coeffs(orb_alpha, orb_beta):
+    '''Return True when both Orbitals objects have the same expansion coefficients'''
+    return orb_alpha.coeffs.shape == orb_beta.coeffs.shape and \
+        (orb_alpha.coeffs == orb_beta.coeffs).all()
+
+
+def _dm_from_occupations(coeffs, occupations):
+    '''Return the density matrix for the given coefficients and occupation numbers
+
+       Only the orbitals with a non-zero occupation number are included in the
+       matrix product.
+    '''
+    indexes = occupations.nonzero()[0]
+    coeffs = coeffs[:, indexes]
+    return np.dot(coeffs*occupations[indexes], coeffs.T)
@@ -115,8 +115,20 @@ def test_dm_ch3_rohf_g03():
     olp = mol.obasis.compute_overlap()
     dm = mol.get_dm_full()
     assert abs(np.einsum('ab,ba', olp, dm) - 9) < 1e-6
+    np.testing.assert_almost_equal(dm, mol.orb_alpha.to_dm() + mol.orb_beta.to_dm())
     dm = mol.get_dm_spin()
     assert abs(np.einsum('ab,ba', olp, dm) - 1) < 1e-6
+    dm_spin = mol.orb_alpha.to_dm() - mol.orb_beta.to_dm()
+    np.testing.assert_almost_equal(dm, dm_spin)
+
+
+def test_dm_spin_equal_orbitals():
+    fn_fchk = context.get_fn('test/water_hfs_321g.fchk')
+    mol = IOData.from_file(fn_fchk)
+    mol.orb_beta = mol.orb_alpha.copy()
+    dm_spin = mol.get_dm_spin()
+    assert dm_spin.shape == (mol.obasis.nbasis, mol.obasis.nbasis)
+    assert (dm_spin == 0.0).all()
 
 
 def test_dms_empty():
@@ -170,7 +170,20 @@ class ScreenLog(object):
             raise RuntimeError('The runlevel should be at least warning when logging.')
         if not self._active:
             self.print_header()
+        for line in self._wrap(s):
+            print(line, file=self._file)
+        self._last_blank = False
+
+    def _wrap(self, s):
+        """Break a string into lines that fit in the width of the screen.
 
+        The first ampersand is interpreted as the place of a hanging indent.
+
+        Returns
+        -------
+        lines : list
+            The lines to be printed. This is empty for an empty string.
+        """
         # Check for alignment code '&'
         pos = s.find('&')
         if pos == -1:
@@ -183,8 +196,8 @@ class ScreenLog(object):
         if width < self.width / 2:
             raise ValueError('The lead may not exceed half the width of the terminal.')
 
-        # Break and print the line
-        first = True
+        # Break the line
+        lines = []
         while len(rest) > 0:
             if len(rest) > width:
                 pos = rest.rfind(' ', 0, width)
@@ -197,11 +210,31 @@ class ScreenLog(object):
             else:
                 current = rest
                 rest = ''
-            print('%s%s' % (lead, current), file=self._file)
-            if first:
-                lead = ' ' * len(lead)
-                first = False
+            lines.append('%s%s' % (lead, current))
+            lead = ' ' * len(lead)
+        return lines
 
+    def lines(self, lines):
+        """Print a block of lines with a single write.
+
+        Every line is wrapped in the same way as with `__call__`, but all output is
+        written at once, which makes this method suitable for tables that are printed
+        frequently.
+
+        Parameters
+        ----------
+        lines : list
+            A list of strings, one for each call to `__call__` it replaces.
+        """
+        if not self.do_warning:
+            raise RuntimeError('The runlevel should be at least warning when logging.')
+        if not self._active:
+            self.print_header()
+        wrapped = []
+        for line in lines:
+            wrapped.extend(self._wrap(line))
+        if len(wrapped) > 0:
+            print('\n'.join(wrapped), file=self._file)
         self._last_blank = False
 
     def warn(self, *words):
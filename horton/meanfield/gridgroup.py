@@ -21,7 +21,10 @@
 """Container for observables involving numerical integration"""
 
 
+import numpy as np
+
 from horton.meanfield.observable import Observable
+from horton.meanfield.orbitals import Orbitals
 from horton.utils import doc_inherit
 
 
@@ -40,11 +43,28 @@ DF_LEVEL_LDA = 0
 DF_LEVEL_GGA = 1
 DF_LEVEL_MGGA = 2
 
+# For each DF level: the prefix of the potential arrays in the cache and the number
+# of columns in the arrays with the density (and derivatives) in the grid points.
+_DF_LEVEL_INFO = {
+    DF_LEVEL_LDA: ('lda', 1),
+    DF_LEVEL_GGA: ('gga', 4),
+    DF_LEVEL_MGGA: ('mgga', 6),
+}
+
+
+def _get_df_level_info(df_level):
+    """Return the cache prefix and the number of columns for a DF level."""
+    info = _DF_LEVEL_INFO.get(df_level)
+    if info is None:
+        raise ValueError('Internal error: non-existent DF level.')
+    return info
+
 
 class GridGroup(Observable):
     """Group of terms for the effective Hamiltonian that use numerical integration."""
 
-    def __init__(self, obasis, grid, grid_terms, label='grid_group', density_cutoff=1e-9):
+    def __init__(self, obasis, grid, grid_terms, label='grid_group', density_cutoff=1e-9,
+                 cache_basis=False):
         """Initialize a GridGroup instance.
 
         Parameters
@@ -62,11 +82,23 @@ class GridGroup(Observable):
             Whenever the density on a grid point falls below this threshold, all data for
             that grid point is set to zero. This is mainly relevant for functionals that
             use derivatives of the density or the orbitals, i.e. GGA and MGGA functionals.
+        cache_basis : bool
+            When True, the basis functions (and their gradients for GGA functionals) are
+            evaluated on the grid only once and kept in memory. The densities and Fock
+            matrices in all SCF iterations are then computed with matrix products. This
+            takes ``8*npoint*nbasis`` bytes (four times more for GGA functionals), i.e.
+            several GB for a typical molecular grid with a few hundred basis functions,
+            so it is off by default. It only pays off for small grids and basis sets
+            that easily fit in memory. The basis functions are never cached for MGGA
+            functionals.
         """
         self.grid_terms = grid_terms
         self.obasis = obasis
         self.grid = grid
         self.density_cutoff = density_cutoff
+        self.cache_basis = cache_basis
+        self._basis_grid = None
+        self._basis_grid_key = None
         Observable.__init__(self, label)
 
     def _get_df_level(self):
@@ -81,10 +113,44 @@ class GridGroup(Observable):
             * ``DF_LEVEL_GGA``: GGA (and LDA) functionals are used.
             * ``DF_LEVEL_MGGA``: MGGA (and LDA and/or GGA) functionals are used.
         """
-        return max([grid_term.df_level for grid_term in self.grid_terms])
+        return max(grid_term.df_level for grid_term in self.grid_terms)
 
     df_level = property(_get_df_level)
 
+    def _use_basis_grid(self):
+        """Return True when the cached basis functions on the grid should be used."""
+        return self.cache_basis and self.df_level in (DF_LEVEL_LDA, DF_LEVEL_GGA)
+
+    def _get_basis_grid(self):
+        """Get the basis functions (and gradients) on the grid, evaluated only once.
+
+        Returns
+        -------
+        basis : np.ndarray, shape=(npoint, nbasis), dtype=float
+            The basis functions in all grid points.
+        basis_gradient : np.ndarray, shape=(npoint, nbasis, 3), dtype=float
+            The gradients of the basis functions in all grid points. This is None for
+            LDA functionals.
+        """
+        # The key holds references to the basis and the grid, instead of their ids,
+        # such that a new object can never be mistaken for a freed one.
+        key = self._basis_grid_key
+        if (key is None or key[0] is not self.obasis or key[1] is not self.grid or
+                key[2] != self.df_level):
+            # Orbitals with unit coefficients are just the basis functions.
+            orb = Orbitals(self.obasis.nbasis)
+            orb.coeffs[:] = np.identity(self.obasis.nbasis)
+            iorbs = np.arange(self.obasis.nbasis)
+            basis = self.obasis.compute_grid_orbitals_exp(orb, self.grid.points, iorbs)
+            if self.df_level == DF_LEVEL_GGA:
+                basis_gradient = self.obasis.compute_grid_orb_gradient_exp(
+                    orb, self.grid.points, iorbs)
+            else:
+                basis_gradient = None
+            self._basis_grid = basis, basis_gradient
+            self._basis_grid_key = self.obasis, self.grid, self.df_level
+        return self._basis_grid
+
     def _get_potentials(self, cache, label='pot', tags=None):
         """Get list of output arrays passed to ```GridObservable.add_pot```.
 
@@ -129,26 +195,27 @@ class GridGroup(Observable):
         """
         # Compute the density (and optionally derivatives, etc.) on all the grid
         # points.
-        if self.df_level == DF_LEVEL_LDA:
-            all_basics, new = cache.load('%sall_%s' % (prefix, select),
-                                         alloc=(self.grid.size, 1), tags=tags)
-            if new:
-                dm = cache['%sdm_%s' % (prefix, select)]
-                self.obasis.compute_grid_density_dm(dm, self.grid.points, all_basics[:, 0])
-        elif self.df_level == DF_LEVEL_GGA:
-            all_basics, new = cache.load('%sall_%s' % (prefix, select),
-                                         alloc=(self.grid.size, 4), tags=tags)
-            if new:
-                dm = cache['%sdm_%s' % (prefix, select)]
-                self.obasis.compute_grid_gga_dm(dm, self.grid.points, all_basics)
-        elif self.df_level == DF_LEVEL_MGGA:
-            all_basics, new = cache.load('%sall_%s' % (prefix, select),
-                                         alloc=(self.grid.size, 6), tags=tags)
-            if new:
-                dm = cache['%sdm_%s' % (prefix, select)]
+        nbasic = _get_df_level_info(self.df_level)[1]
+        all_basics, new = cache.load('%sall_%s' % (prefix, select),
+                                     alloc=(self.grid.size, nbasic), tags=tags)
+        if new:
+            dm = cache['%sdm_%s' % (prefix, select)]
+            if self.df_level == DF_LEVEL_LDA:
+                if self._use_basis_grid():
+                    basis = self._get_basis_grid()[0]
+                    all_basics[:, 0] = np.einsum('pi,pi->p', basis.dot(dm), basis)
+                else:
+                    self.obasis.compute_grid_density_dm(dm, self.grid.points, all_basics[:, 0])
+            elif self.df_level == DF_LEVEL_GGA:
+                if self._use_basis_grid():
+                    basis, basis_gradient = self._get_basis_grid()
+                    basis_dm = basis.dot(dm)
+                    all_basics[:, 0] = np.einsum('pi,pi->p', basis_dm, basis)
+                    all_basics[:, 1:4] = 2*np.einsum('pi,pik->pk', basis_dm, basis_gradient)
+                else:
+                    self.obasis.compute_grid_gga_dm(dm, self.grid.points, all_basics)
+            else:
                 self.obasis.compute_grid_mgga_dm(dm, self.grid.points, all_basics)
-        else:
-            raise ValueError('Internal error: non-existent DF level.')
 
         # Prune grid data where the density is lower than the threshold
         if self.density_cutoff > 0:
@@ -218,6 +285,23 @@ class GridGroup(Observable):
         focks : list of TwoIndex
             A list of Fock matrices.
         """
+        if self._use_basis_grid():
+            basis, basis_gradient = self._get_basis_grid()
+            weights = self.grid.weights
+            for ichannel in range(len(focks)):
+                pot = pots[ichannel]
+                if self.df_level == DF_LEVEL_LDA:
+                    focks[ichannel] += basis.T.dot(basis*(weights*pot[:, 0])[:, None])
+                else:
+                    # Symmetric rank-2k update with the basis functions and the
+                    # combination of the basis and its gradient that multiplies them.
+                    mixed = basis*(0.5*weights*pot[:, 0])[:, None]
+                    mixed += np.einsum('pik,pk->pi', basis_gradient,
+                                       weights[:, None]*pot[:, 1:4])
+                    contrib = basis.T.dot(mixed)
+                    focks[ichannel] += contrib
+                    focks[ichannel] += contrib.T
+            return
         for ichannel in range(len(focks)):
             if self.df_level == DF_LEVEL_LDA:
                 self.obasis.compute_grid_density_fock(
@@ -329,26 +413,12 @@ class RGridGroup(GridGroup):
 
     @doc_inherit(GridGroup)
     def _get_potentials(self, cache, label='pot', tags=None):
-        if self.df_level == DF_LEVEL_LDA:
-            lda_xxx_alpha, new = cache.load('lda_%s_total_alpha' % label,
-                                            alloc=self.grid.size, tags=tags)
-            if new:
-                lda_xxx_alpha[:] = 0.0
-            return (lda_xxx_alpha.reshape(-1, 1),), new
-        elif self.df_level == DF_LEVEL_GGA:
-            gga_xxx_alpha, new = cache.load('gga_%s_total_alpha' % label,
-                                            alloc=(self.grid.size, 4), tags=tags)
-            if new:
-                gga_xxx_alpha[:] = 0.0
-            return (gga_xxx_alpha,), new
-        elif self.df_level == DF_LEVEL_MGGA:
-            mgga_xxx_alpha, new = cache.load('mgga_%s_total_alpha' % label,
-                                             alloc=(self.grid.size, 6), tags=tags)
-            if new:
-                mgga_xxx_alpha[:] = 0.0
-            return (mgga_xxx_alpha,), new
-        else:
-            raise ValueError('Internal error: non-existent DF level.')
+        prefix, nbasic = _get_df_level_info(self.df_level)
+        xxx_alpha, new = cache.load('%s_%s_total_alpha' % (prefix, label),
+                                    alloc=(self.grid.size, nbasic), tags=tags)
+        if new:
+            xxx_alpha[:] = 0.0
+        return (xxx_alpha,), new
 
     @doc_inherit(GridGroup)
     def _update_grid_data(self, cache):
@@ -450,38 +520,16 @@ class UGridGroup(GridGroup):
 
     @doc_inherit(GridGroup)
     def _get_potentials(self, cache, label='pot', tags=None):
-        if self.df_level == DF_LEVEL_LDA:
-            lda_xxx_alpha, newa = cache.load('lda_%s_total_alpha' % label,
-                                             alloc=self.grid.size, tags=tags)
-            if newa:
-                lda_xxx_alpha[:] = 0.0
-            lda_xxx_beta, newb = cache.load('lda_%s_total_beta' % label,
-                                            alloc=self.grid.size, tags=tags)
-            if newb:
-                lda_xxx_beta[:] = 0.0
-            return (lda_xxx_alpha.reshape(-1, 1), lda_xxx_beta.reshape(-1, 1)), (newa or newb)
-        elif self.df_level == DF_LEVEL_GGA:
-            gga_xxx_alpha, newa = cache.load('gga_%s_total_alpha' % label,
-                                             alloc=(self.grid.size, 4), tags=tags)
-            if newa:
-                gga_xxx_alpha[:] = 0.0
-            gga_xxx_beta, newb = cache.load('gga_%s_total_beta' % label,
-                                            alloc=(self.grid.size, 4), tags=tags)
-            if newb:
-                gga_xxx_beta[:] = 0.0
-            return (gga_xxx_alpha, gga_xxx_beta), (newa or newb)
-        elif self.df_level == DF_LEVEL_MGGA:
-            mgga_xxx_alpha, newa = cache.load('mgga_%s_total_alpha' % label,
-                                              alloc=(self.grid.size, 6), tags=tags)
-            if newa:
-                mgga_xxx_alpha[:] = 0.0
-            mgga_xxx_beta, newb = cache.load('mgga_%s_total_beta' % label,
-                                             alloc=(self.grid.size, 6), tags=tags)
-            if newb:
-                mgga_xxx_beta[:] = 0.0
-            return (mgga_xxx_alpha, mgga_xxx_beta), (newa or newb)
-        else:
-            raise ValueError('Internal error: non-existent DF level.')
+        prefix, nbasic = _get_df_level_info(self.df_level)
+        xxx_alpha, newa = cache.load('%s_%s_total_alpha' % (prefix, label),
+                                     alloc=(self.grid.size, nbasic), tags=tags)
+        if newa:
+            xxx_alpha[:] = 0.0
+        xxx_beta, newb = cache.load('%s_%s_total_beta' % (prefix, label),
+                                    alloc=(self.grid.size, nbasic), tags=tags)
+        if newb:
+            xxx_beta[:] = 0.0
+        return (xxx_alpha, xxx_beta), (newa or newb)
 
     @doc_inherit(GridGroup)
     def _update_grid_data(self, cache):
@@ -21,10 +21,12 @@
 '''Initial guesses for wavefunctions'''
 
 
-from horton.log import log, timer
+import numpy as np
 
+from horton.log import log, timer, biblio
 
-__all__ = ['guess_core_hamiltonian']
+
+__all__ = ['guess_core_hamiltonian', 'guess_gwh']
 
 
 @timer.with_section('Initial Guess')
@@ -50,8 +52,49 @@ def guess_core_hamiltonian(overlap, core, *orbs):
     if len(orbs) == 0:
         raise TypeError('At least one set of orbitals.')
 
+    _assign_from_fock(overlap, core, orbs)
+
+
+@timer.with_section('Initial Guess')
+def guess_gwh(overlap, core, *orbs, k=1.75):
+    '''Guess the orbitals with the generalized Wolfsberg-Helmholz approximation.
+
+    The diagonal of the core Hamiltonian is used to construct a Fock-like operator,
+    :math:`F_{ij} = k S_{ij} (H_{ii} + H_{jj})/2` with :math:`F_{ii} = H_{ii}`, which is
+    then diagonalized.
+
+    Parameters
+    ----------
+    overlap : np.ndarray, shape=(nbasis, nbasis), dtype=float
+        The overlap operator.
+    core : np.ndarray, shape=(nbasis, nbasis), dtype=float
+        The core Hamiltonian, usually the sum of the kinetic energy and nuclear
+        attraction integrals. Only its diagonal is used.
+    orb1, orb2, ... : Orbitals
+        A list of Orbitals objects (output arguments)
+    k : float
+        The Wolfsberg-Helmholz constant.
+
+    This method only modifies the expansion coefficients and the orbital energies.
+    '''
+    biblio.cite('wolfsberg1952', 'the generalized Wolfsberg-Helmholz initial guess')
+    if log.do_medium:
+        log('Performing a generalized Wolfsberg-Helmholz guess.')
+        log.blank()
+
+    if len(orbs) == 0:
+        raise TypeError('At least one set of orbitals.')
+
+    diag = np.diag(core)
+    fock = (0.5*k)*overlap*np.add.outer(diag, diag)
+    np.fill_diagonal(fock, diag)
+    _assign_from_fock(overlap, fock, orbs)
+
+
+def _assign_from_fock(overlap, fock, orbs):
+    '''Diagonalize a Fock-like operator and assign the result to all orbitals.'''
     # Compute orbitals.
-    orbs[0].from_fock(core, overlap)
+    orbs[0].from_fock(fock, overlap)
     # Copy to other Orbitals objects.
     for i in range(1, len(orbs)):
         orbs[i].coeffs[:] = orbs[0].coeffs
@@ -122,17 +122,21 @@ class EffHam(object):
 
     def log(self):
         """Write an overview of the last computation on screen."""
-        log('Contributions to the energy:')
-        log.hline()
-        log('                                              term                 Value')
-        log.hline()
+        hline = '~' * log.width
+        lines = [
+            'Contributions to the energy:',
+            hline,
+            '                                              term                 Value',
+            hline,
+        ]
         for term in self.terms:
             energy = self.cache['energy_%s' % term.label]
-            log('%50s  %20.12f' % (term.label, energy))
+            lines.append('%50s  %20.12f' % (term.label, energy))
         for key, energy in self.external.items():
-            log('%50s  %20.12f' % (key, energy))
-        log('%50s  %20.12f' % ('total', self.cache['energy']))
-        log.hline()
+            lines.append('%50s  %20.12f' % (key, energy))
+        lines.append('%50s  %20.12f' % ('total', self.cache['energy']))
+        lines.append(hline)
+        log.lines(lines)
         log.blank()
 
     def compute_fock(self, *focks):
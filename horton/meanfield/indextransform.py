@@ -95,10 +95,10 @@ def four_index_transform(ao_integrals, orb0, orb1=None, orb2=None, orb3=None, me
     if method == 'einsum':
         # The order of the dot products is according to literature
         # conventions.
-        result[:] = np.einsum('sd,pqrs->pqrd', orb3.coeffs, ao_integrals, casting='no', order='C')
-        result[:] = np.einsum('rc,pqrd->pqcd', orb2.coeffs, result, casting='no', order='C')
-        result[:] = np.einsum('qb,pqcd->pbcd', orb1.coeffs, result, casting='no', order='C')
-        result[:] = np.einsum('pa,pbcd->abcd', orb0.coeffs, result, casting='no', order='C')
+        result[:] = np.einsum('sd,pqrs->pqrd', orb3.coeffs, ao_integrals, casting='safe', order='C')
+        result[:] = np.einsum('rc,pqrd->pqcd', orb2.coeffs, result, casting='safe', order='C')
+        result[:] = np.einsum('qb,pqcd->pbcd', orb1.coeffs, result, casting='safe', order='C')
+        result[:] = np.einsum('pa,pbcd->abcd', orb0.coeffs, result, casting='safe', order='C')
     elif method == 'tensordot':
         # because the way tensordot works, the order of the dot products is
         # not according to literature conventions.
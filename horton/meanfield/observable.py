@@ -193,7 +193,24 @@ class UTwoIndexTerm(Observable):
         pass
 
 
-def contract_direct(op, dm):
+def compute_direct_bound(op):
+    """Compute upper bounds for the elements of a four-index operator in a direct term.
+
+    Parameters
+    ----------
+    op : np.ndarray, shape=(nbasis, nbasis, nbasis, nbasis)
+        The four-index operator.
+
+    Returns
+    -------
+    bound : np.ndarray, shape=(nbasis, nbasis)
+        The maximum of ``abs(op[:, b, :, d])`` for every pair ``(b, d)``.
+    """
+    # Two reductions avoid a temporary copy of the four-index operator.
+    return np.maximum(op.max(axis=(0, 2)), -op.min(axis=(0, 2)))
+
+
+def contract_direct(op, dm, bound=None, threshold=0.0):
     """Perform an direct-type contraction with a four-index operator.
 
     Parameters
@@ -202,12 +219,30 @@ def contract_direct(op, dm):
         The four-index operator or its Cholesky decomposition
     dm : np.ndarray, shape=(nbasis, nbasis)
         The density matrix
+    bound : np.ndarray, shape=(nbasis, nbasis)
+        The result of ``compute_direct_bound(op)``. When given, pairs ``(b, d)`` for
+        which ``abs(dm[b, d])*bound[b, d]`` is below the threshold are neglected. Only
+        used for a four-index operator.
+    threshold : float
+        The screening threshold. The error on every element of the result is at most
+        the number of neglected pairs times the threshold.
     """
     if op.ndim == 3:
         # Cholesky decomposition
         tmp = np.tensordot(op, dm, axes=([(1, 2), (1, 0)]))
         return np.tensordot(op, tmp, [0, 0])
     elif op.ndim == 4:
+        if bound is not None and threshold > 0:
+            # Density-based screening: insignificant elements are set to zero.
+            dm = np.where(abs(dm)*bound >= threshold, dm, 0.0)
+            rows = dm.any(axis=1).nonzero()[0]
+            if 2*len(rows) < len(dm):
+                # Only rows with significant elements are contracted, one at a time,
+                # such that no large slices of the operator are copied.
+                result = np.zeros(dm.shape)
+                for b in rows:
+                    result += np.dot(op[:, b], dm[b])
+                return result
         # Normal case
         return np.einsum('abcd,bd->ac', op, dm)
     else:
@@ -217,7 +252,7 @@ def contract_direct(op, dm):
 class RDirectTerm(Observable):
     """Direct term of the expectation value of a two-body operator (restricted)."""
 
-    def __init__(self, op_alpha, label):
+    def __init__(self, op_alpha, label, threshold=0.0):
         """Initialize a RDirectTerm instance.
 
         Parameters
@@ -227,10 +262,26 @@ class RDirectTerm(Observable):
             beta orbitals. Also a Cholesky decomposition of the operator is supported.
         label : str
             A short string to identify the observable.
+        threshold : float
+            Density matrix elements whose contribution to any element of the direct
+            operator is guaranteed to be below this threshold are neglected. Each
+            element of the direct operator may then be off by up to nbasis**2 times
+            the threshold, which also changes the energy. This only pays off for
+            sparse density matrices, e.g. of large molecules. The screening is opt-in:
+            it is disabled (zero) by default and must be requested explicitly. Not
+            used for a Cholesky decomposition.
         """
         self.op_alpha = op_alpha
+        self.threshold = threshold
+        self._bound = None
         Observable.__init__(self, label)
 
+    def _get_bound(self):
+        """Return the bounds used for screening, computed once, or None."""
+        if self.threshold > 0 and self.op_alpha.ndim == 4 and self._bound is None:
+            self._bound = compute_direct_bound(self.op_alpha)
+        return self._bound
+
     def _update_direct(self, cache):
         """Recompute the direct operator if it has become invalid.
 
@@ -242,7 +293,9 @@ class RDirectTerm(Observable):
         dm_alpha = cache['dm_alpha']
         direct, new = cache.load('op_%s_alpha' % self.label, alloc=dm_alpha.shape)
         if new:
-            direct[:] = contract_direct(self.op_alpha, dm_alpha)
+            # The threshold is halved to account for the factor two below.
+            direct[:] = contract_direct(self.op_alpha, dm_alpha, self._get_bound(),
+                                        0.5*self.threshold)
             direct *= 2  # contribution from beta electrons is identical
 
     @doc_inherit(Observable)
@@ -266,7 +319,7 @@ class RDirectTerm(Observable):
 class UDirectTerm(Observable):
     """Direct term of the expectation value of a two-body operator (unrestricted)."""
 
-    def __init__(self, op_alpha, label, op_beta=None):
+    def __init__(self, op_alpha, label, op_beta=None, threshold=0.0):
         """Initialize a UDirectTerm instance.
 
         Parameters
@@ -279,11 +332,27 @@ class UDirectTerm(Observable):
         op_beta
             Expansion of two-body operator in basis of beta orbitals. When not given,
             op_alpha is used. Also a Cholesky decomposition of the operator is supported.
+        threshold : float
+            Density matrix elements whose contribution to any element of the direct
+            operator is guaranteed to be below this threshold are neglected. Each
+            element of the direct operator may then be off by up to nbasis**2 times
+            the threshold, which also changes the energy. This only pays off for
+            sparse density matrices, e.g. of large molecules. The screening is opt-in:
+            it is disabled (zero) by default and must be requested explicitly. Not
+            used for a Cholesky decomposition.
         """
         self.op_alpha = op_alpha
         self.op_beta = op_alpha if op_beta is None else op_beta
+        self.threshold = threshold
+        self._bound = None
         Observable.__init__(self, label)
 
+    def _get_bound(self):
+        """Return the bounds used for screening, computed once, or None."""
+        if self.threshold > 0 and self.op_alpha.ndim == 4 and self._bound is None:
+            self._bound = compute_direct_bound(self.op_alpha)
+        return self._bound
+
     def _update_direct(self, cache):
         """Recompute the direct operator(s) if it/they has/have become invalid.
 
@@ -297,7 +366,8 @@ class UDirectTerm(Observable):
             dm_full = compute_dm_full(cache)
             direct, new = cache.load('op_%s' % self.label, alloc=dm_full.shape)
             if new:
-                direct[:] = contract_direct(self.op_alpha, dm_full)
+                direct[:] = contract_direct(self.op_alpha, dm_full, self._get_bound(),
+                                            self.threshold)
         else:
             # This is probably never going to happen. In case it does, please
             # add the proper code here.
@@ -32,11 +32,15 @@ __all__ = ['Orbitals']
 class Orbitals(object):
     """Orbital coefficient, energies and occupation numbers (single spin channel)."""
 
+    # Orbitals objects are created in large numbers, e.g. in geometry scans, and have
+    # a fixed set of attributes.
+    __slots__ = ['_coeffs', '_energies', '_occupations']
+
     #
     # Constructor and destructor
     #
 
-    def __init__(self, nbasis, nfn=None):
+    def __init__(self, nbasis, nfn=None, dtype=np.float64):
         """Initialize an Orbitals object.
 
         Parameters
@@ -45,10 +49,18 @@ class Orbitals(object):
             The number of basis functions.
         nfn : int
             The number of functions to store. Defaults to nbasis.
+        dtype : np.dtype
+            The data type of the expansion coefficients. Use ``np.float32`` to halve
+            the memory footprint of large sets of orbitals. Energies, occupations
+            and density matrices are always double precision. With ``np.float32``,
+            all coefficients written to this object, e.g. by ``assign`` or
+            ``from_fock``, are rounded to single precision (about seven significant
+            digits). Functions that need double precision coefficients, such as
+            ``GOBasis.compute_grid_orbitals_exp``, work on a promoted copy.
         """
         if nfn is None:
             nfn = nbasis
-        self._coeffs = np.zeros((nbasis, nfn))
+        self._coeffs = np.zeros((nbasis, nfn), dtype)
         self._energies = np.zeros(nfn)
         self._occupations = np.zeros(nfn)
 
@@ -86,6 +98,16 @@ class Orbitals(object):
 
     occupations = property(_get_occupations)
 
+    def _get_occupied_coeffs(self):
+        """The expansion coefficients up to and including the last occupied orbital.
+
+        This is a view on the coefficients, so it reflects later changes of the
+        coefficients but not of the occupations.
+        """
+        return self._coeffs[:, :_get_nocc(self._occupations)]
+
+    occupied_coeffs = property(_get_occupied_coeffs)
+
     #
     # Methods
     #
@@ -110,9 +132,11 @@ class Orbitals(object):
         """
         if grp.attrs['class'] != cls.__name__:
             raise TypeError('The class of the expansion in the HDF5 file does not match.')
-        nbasis, nfn = grp['coeffs'].shape
-        result = cls(nbasis, nfn)
-        grp['coeffs'].read_direct(result._coeffs)
+        # Every dataset is opened only once and read directly into the new arrays.
+        dataset = grp['coeffs']
+        nbasis, nfn = dataset.shape
+        result = cls(nbasis, nfn, dataset.dtype)
+        dataset.read_direct(result._coeffs)
         grp['energies'].read_direct(result._energies)
         grp['occupations'].read_direct(result._occupations)
         return result
@@ -126,9 +150,11 @@ class Orbitals(object):
             Destination where the data are stored.
         """
         grp.attrs['class'] = self.__class__.__name__
-        grp['coeffs'] = self._coeffs
-        grp['energies'] = self._energies
-        grp['occupations'] = self._occupations
+        # Contiguous datasets without modification times keep the metadata updates
+        # to a minimum when checkpoints are written frequently.
+        grp.create_dataset('coeffs', data=self._coeffs, track_times=False)
+        grp.create_dataset('energies', data=self._energies, track_times=False)
+        grp.create_dataset('occupations', data=self._occupations, track_times=False)
 
     def clear(self):
         """Reset all elements to zero."""
@@ -138,7 +164,7 @@ class Orbitals(object):
 
     def copy(self):
         """Return a copy of the object."""
-        result = Orbitals(self.nbasis, self.nfn)
+        result = Orbitals(self.nbasis, self.nfn, self._coeffs.dtype)
         result._coeffs[:] = self._coeffs
         result._energies[:] = self._energies
         result._occupations[:] = self._occupations
@@ -150,7 +176,8 @@ class Orbitals(object):
         Parameters
         ----------
         other : Orbitals
-            Another Orbitals object
+            Another Orbitals object. Its coefficients are converted to the data type
+            of this object, which may lose precision.
         """
         check_type('other', other, Orbitals)
         self._coeffs[:] = other._coeffs
@@ -171,7 +198,7 @@ class Orbitals(object):
         permutation : np.ndarray, dtype=int, shape=(nbasis,)
             An array that defines the new order of the basis functions.
         """
-        self._coeffs[:] = self.coeffs[permutation]
+        self._coeffs[:] = self._coeffs[permutation]
 
     def permute_orbitals(self, permutation):
         """Reorder the coefficients for a given permutation of orbitals (columns).
@@ -181,7 +208,7 @@ class Orbitals(object):
         permutation : np.ndarray, dtype=int, shape=(nbasis,)
             An array that defines the new order of the orbitals.
         """
-        self._coeffs[:] = self.coeffs[:, permutation]
+        self._coeffs[:] = self._coeffs[:, permutation]
 
     def change_basis_signs(self, signs):
         """Correct for different sign conventions of the basis functions.
@@ -205,12 +232,11 @@ class Orbitals(object):
         eps : float
             The allowed deviation from unity, very loose by default.
         """
-        for i in range(self.nfn):
-            if self.occupations[i] == 0:
-                continue
-            norm = np.dot(self._coeffs[:, i], np.dot(overlap, self._coeffs[:, i]))
-            # print i, norm
-            assert abs(norm - 1) < eps, 'The orbitals are not normalized!'
+        # The norms of all occupied orbitals are computed at once as the diagonal of
+        # the quadratic form C^T S C.
+        coeffs = self._coeffs[:, self._occupations != 0]
+        norms = np.einsum('ij,ij->j', coeffs, np.dot(overlap, coeffs))
+        assert (abs(norms - 1) < eps).all(), 'The orbitals are not normalized!'
 
     def check_orthonormality(self, overlap, eps=1e-4):
         """Check that the occupied orbitals are orthogonal and normalized.
@@ -225,10 +251,10 @@ class Orbitals(object):
             The allowed deviation from unity, very loose by default.
         """
         for i0 in range(self.nfn):
-            if self.occupations[i0] == 0:
+            if self._occupations[i0] == 0:
                 continue
             for i1 in range(i0 + 1):
-                if self.occupations[i1] == 0:
+                if self._occupations[i1] == 0:
                     continue
                 dot = np.dot(self._coeffs[:, i0], np.dot(overlap, self._coeffs[:, i1]))
                 if i0 == i1:
@@ -251,14 +277,16 @@ class Orbitals(object):
         error : float
             The RMSD error on the orbital energies.
         """
-        errors = np.dot(fock, (self.coeffs)) \
-                 - self.energies * np.dot(overlap, (self.coeffs))
+        errors = np.dot(fock, (self._coeffs)) \
+                 - self._energies * np.dot(overlap, (self._coeffs))
         return np.sqrt((abs(errors) ** 2).mean())
 
     def from_fock(self, fock, overlap):
         """Diagonalize a Fock matrix to obtain orbitals and energies.
 
-        This method updated the attributes ``coeffs`` and ``energies`` in-place.
+        This method updated the attributes ``coeffs`` and ``energies`` in-place. The
+        diagonalization is done in double precision. The resulting coefficients are
+        rounded when this object stores them in single precision.
 
         Parameters
         ----------
@@ -305,7 +333,7 @@ class Orbitals(object):
         clusters = []
         begin = 0
         for ifn in range(1, self.nfn):
-            if abs(self.energies[ifn] - self.energies[ifn - 1]) > epstol:
+            if abs(self._energies[ifn] - self._energies[ifn - 1]) > epstol:
                 end = ifn
                 clusters.append([begin, end])
                 begin = ifn
@@ -316,21 +344,21 @@ class Orbitals(object):
         sds = np.dot(overlap.T, np.dot(dm, overlap))
         for begin, end in clusters:
             if end - begin == 1:
-                self.occupations[begin] = np.dot(self.coeffs[:, begin], np.dot(sds, self.coeffs[:, begin]))
+                self._occupations[begin] = np.dot(self._coeffs[:, begin], np.dot(sds, self._coeffs[:, begin]))
             else:
                 # Build matrix
-                mat = np.dot(self.coeffs[:, begin:end].T, np.dot(sds, self.coeffs[:, begin:end]))
+                mat = np.dot(self._coeffs[:, begin:end].T, np.dot(sds, self._coeffs[:, begin:end]))
                 # Diagonalize and reverse order
                 evals, evecs = np.linalg.eigh(mat)
                 evals = evals[::-1]
                 evecs = evecs[:, ::-1]
                 # Rotate the orbitals
-                self.coeffs[:, begin:end] = np.dot(self.coeffs[:, begin:end], evecs)
+                self._coeffs[:, begin:end] = np.dot(self._coeffs[:, begin:end], evecs)
                 # Compute expectation values
-                self.occupations[begin:end] = evals
+                self._occupations[begin:end] = evals
                 for i0 in range(end - begin):
-                    self.energies[begin + i0] = np.dot(self.coeffs[:, begin + i0],
-                                                       np.dot(fock, self.coeffs[:, begin + i0]))
+                    self._energies[begin + i0] = np.dot(self._coeffs[:, begin + i0],
+                                                        np.dot(fock, self._coeffs[:, begin + i0]))
 
     def derive_naturals(self, dm, overlap):
         """Derive natural orbitals from a given density matrix and assign the result to self.
@@ -361,7 +389,7 @@ class Orbitals(object):
         """
         if offset < 0:
             raise ValueError('Offset must be zero or positive.')
-        homo_indexes = self.occupations.nonzero()[0]
+        homo_indexes = self._occupations.nonzero()[0]
         if len(homo_indexes) > offset:
             return homo_indexes[len(homo_indexes) - offset - 1]
 
@@ -378,7 +406,7 @@ class Orbitals(object):
         """
         index = self.get_homo_index(offset)
         if index is not None:
-            return self.energies[index]
+            return self._energies[index]
 
     homo_energy = property(get_homo_energy)
 
@@ -393,7 +421,7 @@ class Orbitals(object):
         """
         if offset < 0:
             raise ValueError('Offset must be zero or positive.')
-        lumo_indexes = (self.occupations == 0.0).nonzero()[0]
+        lumo_indexes = (self._occupations == 0.0).nonzero()[0]
         if len(lumo_indexes) > offset:
             return lumo_indexes[offset]
 
@@ -410,27 +438,89 @@ class Orbitals(object):
         """
         index = self.get_lumo_index(offset)
         if index is not None:
-            return self.energies[index]
+            return self._energies[index]
 
     lumo_energy = property(get_lumo_energy)
 
-    def to_dm(self, other=None):
+    def to_dm(self, other=None, out=None):
         """Compute the density matrix.
 
         Parameters
         ----------
         other : Orbitals
             Another Orbitals object to construct a transfer-density matrix.
+        out : np.ndarray, shape=(nbasis, nbasis)
+            When given, the density matrix is stored in this array, e.g. to reuse
+            the same buffer in every SCF iteration.
 
         Returns
         -------
         dm : np.ndarray, shape=(nbasis, nbasis)
             The density matrix.
         """
+        if out is not None and out.shape != (self.nbasis, self.nbasis):
+            raise TypeError('The argument out has the wrong shape.')
+        if other is None:
+            occupations = self._occupations
+        else:
+            occupations = (self._occupations * other._occupations) ** 0.5
+        # Only the orbitals up to the last occupied one contribute, such that a
+        # single matrix product with nocc instead of nfn columns suffices.
+        nocc = _get_nocc(occupations)
+        coeffs = self._coeffs[:, :nocc]
         if other is None:
-            return np.dot(self._coeffs * self.occupations, self._coeffs.T)
+            # Single precision coefficients are only promoted for the matrix product.
+            # The density matrix is always computed in double precision.
+            left = coeffs.astype(np.float64, copy=False)
+            right = left.T
+        else:
+            left = coeffs
+            right = other._coeffs[:, :nocc].T.astype(np.float64, copy=False)
+        left = left * occupations[:nocc]
+        if out is None:
+            return np.dot(left, right)
+        if out.dtype == np.float64 and out.flags.c_contiguous:
+            np.dot(left, right, out=out)
         else:
-            return np.dot(self._coeffs * (self.occupations * other.occupations) ** 0.5, other._coeffs.T)
+            out[:] = np.dot(left, right)
+        return out
+
+    def to_dms(self, occupations, out=None):
+        """Compute several density matrices from the same orbitals.
+
+        This is useful when many density matrices are needed for one set of orbitals,
+        e.g. for energy-resolved densities. The occupied block of the coefficients is
+        prepared only once and all results are written into a single array.
+
+        Parameters
+        ----------
+        occupations : np.ndarray, shape=(ndm, nfn)
+            The occupation numbers for each density matrix.
+        out : np.ndarray, shape=(ndm, nbasis, nbasis)
+            When given, the density matrices are stored in this array.
+
+        Returns
+        -------
+        dms : np.ndarray, shape=(ndm, nbasis, nbasis)
+            The density matrices.
+        """
+        if occupations.ndim != 2 or occupations.shape[1] != self.nfn:
+            raise TypeError('The argument occupations has the wrong shape.')
+        ndm = occupations.shape[0]
+        if out is None:
+            out = np.zeros((ndm, self.nbasis, self.nbasis))
+        elif out.shape != (ndm, self.nbasis, self.nbasis):
+            raise TypeError('The argument out has the wrong shape.')
+        nocc = _get_nocc(occupations.any(axis=0))
+        coeffs = self._coeffs[:, :nocc].astype(np.float64)
+        # One matrix product per density matrix, directly into the output, was
+        # found to be faster than a batched einsum over precomputed products of
+        # the orbital coefficients, except for very small basis sets.
+        scaled = np.zeros(coeffs.shape)
+        for idm in range(ndm):
+            np.multiply(coeffs, occupations[idm, :nocc], out=scaled)
+            np.dot(scaled, coeffs.T, out=out[idm])
+        return out
 
     def rotate_random(self):
         """Apply random unitary transformation distributed with Haar measure.
@@ -439,7 +529,7 @@ class Orbitals(object):
         """
         z = np.random.normal(0, 1, (self.nfn, self.nfn))
         q, r = np.linalg.qr(z)
-        self.coeffs[:] = np.dot(self.coeffs, q)
+        self._coeffs[:] = np.dot(self._coeffs, q)
 
     def rotate_2orbitals(self, angle=0.7853981633974483, index0=None, index1=None):
         """Rotate two orbitals.
@@ -457,10 +547,10 @@ class Orbitals(object):
             index0 = self.homo_index
         if index1 == None:
             index1 = self.lumo_index
-        old0 = self.coeffs[:, index0].copy()
-        old1 = self.coeffs[:, index1].copy()
-        self.coeffs[:, index0] = np.cos(angle) * old0 - np.sin(angle) * old1
-        self.coeffs[:, index1] = np.sin(angle) * old0 + np.cos(angle) * old1
+        old0 = self._coeffs[:, index0].copy()
+        old1 = self._coeffs[:, index1].copy()
+        self._coeffs[:, index0] = np.cos(angle) * old0 - np.sin(angle) * old1
+        self._coeffs[:, index1] = np.sin(angle) * old0 + np.cos(angle) * old1
 
     def swap_orbitals(self, swaps):
         """Change the order of the orbitals using pair-exchange.
@@ -479,10 +569,18 @@ class Orbitals(object):
             index0, index1 = swaps[iswap]
             if log.do_medium:
                 log('  Swapping orbitals %i and %i' % (index0, index1))
-            tmp = self.coeffs[:, index0].copy()
-            self.coeffs[:, index0] = self.coeffs[:, index1]
-            self.coeffs[:, index1] = tmp
-            self.energies[index0], self.energies[index1] = \
-                self.energies[index1], self.energies[index0]
-            self.occupations[index0], self.occupations[index1] = \
-                self.occupations[index1], self.occupations[index0]
+            tmp = self._coeffs[:, index0].copy()
+            self._coeffs[:, index0] = self._coeffs[:, index1]
+            self._coeffs[:, index1] = tmp
+            self._energies[index0], self._energies[index1] = \
+                self._energies[index1], self._energies[index0]
+            self._occupations[index0], self._occupations[index1] = \
+                self._occupations[index1], self._occupations[index0]
+
+
+def _get_nocc(occupations):
+    """Return the number of orbitals up to and including the last occupied one."""
+    iocc = np.flatnonzero(occupations)
+    if len(iocc) == 0:
+        return 0
+    return iocc[-1] + 1
@@ -154,7 +154,7 @@ class DIISSCFSolver(object):
                 self._orbs[i].from_fock(self._focks[i], overlap)
             occ_model.assign(*self._orbs)
             for i in range(ham.ndm):
-                dms[i][:] = self._orbs[i].to_dm()
+                self._orbs[i].to_dm(out=dms[i])
             ham.reset(*dms)
             energy = ham.compute_energy() if self._history.need_energy else None
             ham.compute_fock(*self._focks)
@@ -383,16 +383,18 @@ class DIISHistory(object):
     def log(self, coeffs):
         eref = min((state.energy for state in self.stack[:self.nused] if state.energy), default=None)
         if eref is None:
-            log('          DIIS history          normsq       coeff         id')
+            lines = ['          DIIS history          normsq       coeff         id']
             for i in range(self.nused):
                 state = self.stack[i]
-                log('          DIIS history  %12.5e  %12.7f   %8i' % (state.normsq, coeffs[i], state.identity))
+                lines.append('          DIIS history  %12.5e  %12.7f   %8i' % (
+                    state.normsq, coeffs[i], state.identity))
         else:
-            log('          DIIS history          normsq      energy         coeff         id')
+            lines = ['          DIIS history          normsq      energy         coeff         id']
             for i in range(self.nused):
                 state = self.stack[i]
-                log('          DIIS history  %12.5e  %12.5e  %12.7f   %8i' % (
+                lines.append('          DIIS history  %12.5e  %12.5e  %12.7f   %8i' % (
                     state.normsq, state.energy - eref, coeffs[i], state.identity))
+        log.lines(lines)
         log.blank()
 
     def solve(self, dms_output, focks_output):
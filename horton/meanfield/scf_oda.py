@@ -202,7 +202,7 @@ class ODASCFSolver(object):
             occ_model.assign(*orbs)
             # Construct the density matrices
             for i in range(ham.ndm):
-                dm1s[i][:] = orbs[i].to_dm()
+                orbs[i].to_dm(out=dm1s[i])
 
             # feed the latest density matrices in the hamiltonian
             ham.reset(*dm1s)
@@ -21,6 +21,7 @@
 """Test horton/meanfield/gridgroup.py."""
 
 
+import numpy as np
 from nose.tools import assert_raises
 
 from horton import *  # pylint: disable=wildcard-import,unused-wildcard-import
@@ -77,3 +78,65 @@ def test_gridgroup_exceptions():
         ugg._update_grid_basics(cache, 'alpha')
     with assert_raises(ValueError):
         ugg._get_potentials(cache)
+
+
+def check_gridgroup_cache_basis(grid_term):
+    # prepare some molecule
+    fn_fchk = context.get_fn('test/co_pbe_sto3g.fchk')
+    mol = IOData.from_file(fn_fchk)
+    grid = BeckeMolGrid(mol.coordinates, mol.numbers, mol.pseudo_numbers, random_rotate=False)
+
+    results = []
+    for cache_basis in True, False:
+        cache = Cache()
+        cache['dm_alpha'] = mol.orb_alpha.to_dm()
+        rgg = RGridGroup(mol.obasis, grid, [grid_term], cache_basis=cache_basis)
+        alpha_basics = rgg._update_grid_basics(cache, 'alpha')
+        fock = np.zeros((mol.obasis.nbasis, mol.obasis.nbasis))
+        rgg.add_fock(cache, fock)
+        results.append((alpha_basics, fock))
+    assert abs(results[0][0] - results[1][0]).max() < 1e-10
+    assert abs(results[0][1] - results[1][1]).max() < 1e-10
+
+
+def test_gridgroup_cache_basis_lda():
+    check_gridgroup_cache_basis(RLibXCLDA('x'))
+
+
+def test_gridgroup_cache_basis_gga():
+    check_gridgroup_cache_basis(RLibXCGGA('x_pbe'))
+
+
+def test_gridgroup_cache_basis_new_grid():
+    # prepare some molecule
+    fn_fchk = context.get_fn('test/co_pbe_sto3g.fchk')
+    mol = IOData.from_file(fn_fchk)
+    grid1 = BeckeMolGrid(mol.coordinates, mol.numbers, mol.pseudo_numbers, random_rotate=False)
+    rgg = RGridGroup(mol.obasis, grid1, [RLibXCGGA('x_pbe')], cache_basis=True)
+    basis1, basis_gradient1 = rgg._get_basis_grid()
+    assert basis1.shape == (grid1.size, mol.obasis.nbasis)
+    assert rgg._get_basis_grid()[0] is basis1
+
+    # The cached basis functions must be recomputed for a new grid.
+    grid2 = BeckeMolGrid(mol.coordinates, mol.numbers, mol.pseudo_numbers, 'coarse',
+                         random_rotate=False)
+    rgg.grid = grid2
+    basis2, basis_gradient2 = rgg._get_basis_grid()
+    assert basis2 is not basis1
+    assert basis2.shape == (grid2.size, mol.obasis.nbasis)
+    assert basis_gradient2.shape == (grid2.size, mol.obasis.nbasis, 3)
+    orb = Orbitals(mol.obasis.nbasis)
+    orb.coeffs[:] = np.identity(mol.obasis.nbasis)
+    iorbs = np.arange(mol.obasis.nbasis)
+    np.testing.assert_almost_equal(
+        basis2, mol.obasis.compute_grid_orbitals_exp(orb, grid2.points, iorbs))
+
+
+def test_gridgroup_df_level_follows_grid_terms():
+    grid_terms = [RLibXCLDA('x')]
+    rgg = RGridGroup(None, None, grid_terms)
+    assert rgg.df_level == DF_LEVEL_LDA
+    grid_terms.append(RLibXCGGA('x_pbe'))
+    assert rgg.df_level == DF_LEVEL_GGA
+    rgg.grid_terms.append(RLibXCMGGA('c_tpss'))
+    assert rgg.df_level == DF_LEVEL_MGGA
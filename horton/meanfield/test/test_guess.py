@@ -50,3 +50,37 @@ def test_guess_hamcore_os():
     assert (mol.orb_alpha.energies.argsort() == np.arange(mol.obasis.nbasis)).all()
     assert abs(mol.orb_alpha.energies - mol.orb_beta.energies).max() < 1e-10
     assert abs(mol.orb_alpha.coeffs - mol.orb_beta.coeffs).max() < 1e-10
+
+
+def test_guess_gwh_cs():
+    fn_fchk = context.get_fn('test/hf_sto3g.fchk')
+    mol = IOData.from_file(fn_fchk)
+    olp = mol.obasis.compute_overlap()
+    kin = mol.obasis.compute_kinetic()
+    na = mol.obasis.compute_nuclear_attraction(mol.coordinates, mol.pseudo_numbers)
+    core = kin + na
+    guess_gwh(olp, core, mol.orb_alpha)
+    assert (mol.orb_alpha.energies.argsort() == np.arange(mol.obasis.nbasis)).all()
+    mol.orb_alpha.check_orthonormality(olp)
+    # Compare with an explicit construction of the GWH operator.
+    fock = np.zeros(olp.shape)
+    for i in range(mol.obasis.nbasis):
+        for j in range(mol.obasis.nbasis):
+            if i == j:
+                fock[i, j] = core[i, i]
+            else:
+                fock[i, j] = 0.875*olp[i, j]*(core[i, i] + core[j, j])
+    assert mol.orb_alpha.error_eigen(fock, olp) < 1e-10
+
+
+def test_guess_gwh_os():
+    fn_fchk = context.get_fn('test/li_h_3-21G_hf_g09.fchk')
+    mol = IOData.from_file(fn_fchk)
+    olp = mol.obasis.compute_overlap()
+    kin = mol.obasis.compute_kinetic()
+    na = mol.obasis.compute_nuclear_attraction(mol.coordinates, mol.pseudo_numbers)
+    guess_gwh(olp, kin+na, mol.orb_alpha, mol.orb_beta)
+    assert abs(mol.orb_alpha.energies[0] - (-2.76116635E+00)) > 1e-5 # values from fchk must be overwritten
+    assert (mol.orb_alpha.energies.argsort() == np.arange(mol.obasis.nbasis)).all()
+    assert abs(mol.orb_alpha.energies - mol.orb_beta.energies).max() < 1e-10
+    assert abs(mol.orb_alpha.coeffs - mol.orb_beta.coeffs).max() < 1e-10
@@ -21,7 +21,10 @@
 """Unit tests for horton/meanfield/observable.py."""
 
 
+import numpy as np
+
 from horton import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from horton.meanfield.observable import compute_direct_bound, contract_direct
 from horton.meanfield.test.common import check_dot_hessian, \
     check_dot_hessian_polynomial, check_dot_hessian_cache
 
@@ -130,3 +133,68 @@ def test_dot_hessian_uhf_fd_cholesky():
 def test_cache_dot_hessian_uhf_cholesky():
     mol, _olp, _core, ham = setup_uhf_case(True)
     check_dot_hessian_cache(ham, mol.dm_alpha, mol.dm_beta)
+
+
+def test_contract_direct_screening():
+    mol, _olp, _core, _ham = setup_rhf_case()
+    er = mol.obasis.compute_electron_repulsion()
+    bound = compute_direct_bound(er)
+    assert (bound >= abs(er).max(axis=(0, 2))).all()
+    # A sparse density matrix, such that the screened code path is used.
+    dm = mol.dm_alpha.copy()
+    dm[abs(dm) < 0.5*abs(dm).max()] = 0.0
+    expected = contract_direct(er, dm)
+    np.testing.assert_allclose(contract_direct(er, dm, bound, 1e-12), expected, atol=1e-10)
+    # With a huge threshold, everything is neglected.
+    assert (contract_direct(er, dm, bound, 1e10) == 0.0).all()
+
+
+def test_contract_direct_screening_rows():
+    # Only rows 2 and 7 of the density matrix are significant, such that the
+    # row-by-row contraction is used.
+    nbasis = 10
+    op = np.random.uniform(-1, 1, (nbasis, nbasis, nbasis, nbasis))
+    op = op + op.transpose(1, 0, 3, 2)
+    dm = np.random.uniform(-1e-14, 1e-14, (nbasis, nbasis))
+    dm[2] = np.random.uniform(-1, 1, nbasis)
+    dm[7] = np.random.uniform(-1, 1, nbasis)
+    bound = compute_direct_bound(op)
+    threshold = 1e-10
+    assert ((abs(dm)*bound >= threshold).any(axis=1).sum()) == 2
+    expected = np.einsum('abcd,bd->ac', op, dm)
+    result = contract_direct(op, dm, bound, threshold)
+    # The error is bounded by the number of neglected pairs times the threshold.
+    assert abs(result - expected).max() < nbasis**2*threshold
+    assert abs(result - expected).max() > 0.0
+    # Without screening, the result is the plain contraction.
+    np.testing.assert_allclose(contract_direct(op, dm), expected)
+
+
+def test_direct_terms_screening():
+    # The screening is opt-in.
+    assert RDirectTerm(np.zeros((2, 2, 2, 2)), 'hartree').threshold == 0.0
+    assert UDirectTerm(np.zeros((2, 2, 2, 2)), 'hartree').threshold == 0.0
+    # Only the elements in row and column 3 of the density matrix are significant.
+    nbasis = 10
+    op = np.random.uniform(-1, 1, (nbasis, nbasis, nbasis, nbasis))
+    op = op + op.transpose(1, 0, 3, 2)
+    dm = np.random.uniform(-1e-14, 1e-14, (nbasis, nbasis))
+    dm[3] = np.random.uniform(-1, 1, nbasis)
+    dm = 0.5*(dm + dm.T)
+    threshold = 1e-10
+    for term_class, ndm in (RDirectTerm, 1), (UDirectTerm, 2):
+        results = []
+        for term in term_class(op, 'hartree'), term_class(op, 'hartree', threshold=threshold):
+            cache = Cache()
+            cache['dm_alpha'] = dm
+            if ndm == 2:
+                cache['dm_beta'] = dm
+            focks = [np.zeros((nbasis, nbasis)) for i in range(ndm)]
+            term.add_fock(cache, *focks)
+            results.append((term.compute_energy(cache), focks[0]))
+        (energy, fock), (energy_screened, fock_screened) = results
+        # Some pairs are neglected, but the error stays within the documented bound.
+        error = abs(fock_screened - fock).max()
+        assert error > 0.0
+        assert error < nbasis**2*threshold
+        assert abs(energy_screened - energy) < ndm*nbasis**2*threshold*abs(dm).sum()
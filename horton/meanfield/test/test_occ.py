@@ -21,6 +21,7 @@
 
 
 import numpy as np
+from nose.tools import assert_raises
 
 from horton import *  # pylint: disable=wildcard-import,unused-wildcard-import
 
@@ -61,6 +62,20 @@ def test_occ_aufbau_os():
     assert abs(orb_beta.occupations[:5] - [1.0, 1.0, 1.0, 0.1, 0.0]).max() < 1e-10
 
 
+def test_occ_aufbau_errors():
+    with assert_raises(ElectronCountError):
+        AufbauOccModel(-1)
+    with assert_raises(ElectronCountError):
+        AufbauOccModel(3, -0.5)
+    with assert_raises(ElectronCountError):
+        AufbauOccModel(0, 0)
+    with assert_raises(ElectronCountError):
+        AufbauOccModel()
+    with assert_raises(ElectronCountError):
+        FermiOccModel(0.0)
+    assert AufbauOccModel(0, 1).noccs == (0, 1)
+
+
 def test_fermi_occ_model_cs_helium():
     fn_fchk = context.get_fn('test/helium_hf_sto3g.fchk')
     mol = IOData.from_file(fn_fchk)
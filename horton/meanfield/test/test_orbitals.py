@@ -101,6 +101,17 @@ def test_orbitals_hdf5():
                 Orbitals.from_hdf5(f)
 
 
+def test_orbitals_hdf5_float32():
+    a = Orbitals(6, 3, np.float32)
+    a.randomize()
+    with h5.File('horton.meanfield.test.test_orbitals.test_orbitals_hdf5_float32', "w",
+                 driver='core', backing_store=False) as f:
+        a.to_hdf5(f)
+        b = Orbitals.from_hdf5(f)
+        assert b.coeffs.dtype == np.float32
+        assert a == b
+
+
 def test_orbitals_copy_new_randomize_clear_assign():
     for args in (4,), (6, 3):
         a = Orbitals(*args)
@@ -317,6 +328,87 @@ def test_orbitals_to_dm3():
     assert (dm != dm.T).any()
 
 
+def test_orbitals_to_dm4():
+    orb = Orbitals(10, 8)
+    orb.randomize()
+    # fractional occupations and empty orbitals before the last occupied one
+    orb.occupations[:] = [1.0, 0.5, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0]
+    expected = np.dot(orb.coeffs*orb.occupations, orb.coeffs.T)
+    np.testing.assert_almost_equal(orb.to_dm(), expected)
+    orb.occupations[:] = 0.0
+    assert (orb.to_dm() == 0.0).all()
+    assert orb.to_dm().shape == (10, 10)
+
+
+def test_orbitals_occupied_coeffs():
+    orb = Orbitals(10, 8)
+    orb.randomize()
+    orb.occupations[:] = [1.0, 0.0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0]
+    occupied = orb.occupied_coeffs
+    assert occupied.shape == (10, 3)
+    assert (occupied == orb.coeffs[:, :3]).all()
+    orb.coeffs[1, 2] = 5.0
+    assert occupied[1, 2] == 5.0
+    orb.occupations[:] = 0.0
+    assert orb.occupied_coeffs.shape == (10, 0)
+
+
+def test_orbitals_to_dm_float32():
+    orb64 = Orbitals(10, 8)
+    orb64.randomize()
+    orb64.occupations[:] = [1.0, 1.0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0]
+    orb32 = Orbitals(10, 8, np.float32)
+    orb32.assign(orb64)
+    assert orb32.coeffs.dtype == np.float32
+    assert orb32.copy().coeffs.dtype == np.float32
+    dm = orb32.to_dm()
+    assert dm.dtype == np.float64
+    coeffs = orb32.coeffs.astype(np.float64)
+    np.testing.assert_almost_equal(dm, np.dot(coeffs*orb32.occupations, coeffs.T))
+    np.testing.assert_allclose(dm, orb64.to_dm(), rtol=0, atol=1e-5)
+    np.testing.assert_almost_equal(orb64.to_dm(orb32), np.dot(orb64.coeffs*orb32.occupations, coeffs.T))
+
+
+def test_orbitals_to_dm_out():
+    orb = Orbitals(10, 8)
+    orb.randomize()
+    orb.occupations[:] = [1.0, 1.0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0]
+    expected = np.dot(orb.coeffs*orb.occupations, orb.coeffs.T)
+    dm = np.random.normal(0, 1, (10, 10))
+    assert orb.to_dm(out=dm) is dm
+    np.testing.assert_almost_equal(dm, expected)
+    # Non-contiguous output arrays work too.
+    big = np.zeros((10, 20))
+    orb.to_dm(out=big[:, ::2])
+    np.testing.assert_almost_equal(big[:, ::2], expected)
+    other = orb.copy()
+    other.occupations[1] = 0.0
+    orb.to_dm(other, out=dm)
+    np.testing.assert_almost_equal(dm, orb.to_dm(other))
+    with assert_raises(TypeError):
+        orb.to_dm(out=np.zeros((10, 8)))
+
+
+def test_orbitals_to_dms():
+    orb = Orbitals(10, 8)
+    orb.randomize()
+    occupations = np.zeros((5, 8))
+    occupations[:, :4] = np.random.uniform(0, 1, (5, 4))
+    occupations[3] = 0.0
+    dms = orb.to_dms(occupations)
+    assert dms.shape == (5, 10, 10)
+    for idm in range(5):
+        orb.occupations[:] = occupations[idm]
+        np.testing.assert_almost_equal(dms[idm], orb.to_dm())
+    out = np.ones((5, 10, 10))
+    assert orb.to_dms(occupations, out) is out
+    np.testing.assert_almost_equal(out, dms)
+    with assert_raises(TypeError):
+        orb.to_dms(occupations[:, :6])
+    with assert_raises(TypeError):
+        orb.to_dms(occupations, np.zeros((4, 10, 10)))
+
+
 def test_orbitals_rotate_random():
     orb0, olp = get_random_orbitals(5)
     orb0.check_normalization(olp)
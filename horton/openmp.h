@@ -0,0 +1,94 @@
+// HORTON: Helpful Open-source Research TOol for N-fermion systems.
+// Copyright (C) 2011-2022 The HORTON Development Team
+//
+// This file is part of HORTON.
+//
+// HORTON is free software; you can redistribute it and/or
+// modify it under the terms of the GNU General Public License
+// as published by the Free Software Foundation; either version 3
+// of the License, or (at your option) any later version.
+//
+// HORTON is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with this program; if not, see <http://www.gnu.org/licenses/>
+//
+//--
+
+
+// UPDATELIBDOCTITLE: Thread count for the OpenMP parallel loops
+
+#ifndef HORTON_OPENMP_H
+#define HORTON_OPENMP_H
+
+#include <exception>
+
+#ifdef _OPENMP
+#include <omp.h>
+#include <cstdlib>
+
+/** @brief
+        The number of threads used in OpenMP parallel regions.
+
+    The environment variable HORTON_NUM_THREADS takes precedence over the usual
+    OpenMP settings, e.g. OMP_NUM_THREADS.
+  */
+inline int get_num_threads() {
+    const char* value = getenv("HORTON_NUM_THREADS");
+    if (value != NULL) {
+        int nthread = atoi(value);
+        if (nthread > 0) return nthread;
+    }
+    return omp_get_max_threads();
+}
+#endif
+
+/** @brief
+        Keeps the first exception thrown by any thread in an OpenMP parallel region.
+
+    An exception may not leave a parallel region because that calls std::terminate,
+    which would kill the Python interpreter. Code in a parallel region catches all
+    exceptions and passes them to store(). Remaining work is skipped as soon as
+    failed() returns true. After the region, rethrow() raises the stored exception
+    in the calling thread, such that Cython can convert it into a Python exception.
+  */
+class ThreadExceptions {
+ public:
+  ThreadExceptions() : failed_(0) {}
+
+  /** @brief
+          Store the exception being handled. Must be called in a catch block.
+    */
+  void store() {
+#pragma omp critical(horton_thread_exceptions)
+    {
+      if (!failed_) {
+        exception_ = std::current_exception();
+#pragma omp atomic write
+        failed_ = 1;
+      }
+    }
+  }
+
+  //! Return true when one of the threads has stored an exception.
+  bool failed() {
+    int result;
+#pragma omp atomic read
+    result = failed_;
+    return result != 0;
+  }
+
+  //! Rethrow the stored exception, if any. Call this after the parallel region.
+  void rethrow() {
+    if (failed_) std::rethrow_exception(exception_);
+  }
+
+ private:
+  int failed_;
+  std::exception_ptr exception_;
+};
+
+#endif
@@ -19,8 +19,10 @@
 #
 # --
 
+from io import StringIO
 
 from horton import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from horton.log import ScreenLog
 
 
 def test_recursive_timer():
@@ -31,3 +33,25 @@ def test_recursive_timer():
         else:
             return factorial(n-1)*n
     assert factorial(4) == 24
+
+
+def test_lines():
+    f = StringIO()
+    screen_log = ScreenLog('HORTON', '2.1.0', '', '', timer, biblio, f)
+    lines = ['first line', '  indented second line', ' '.join(['word']*20)]
+    screen_log.lines(lines)
+    assert f.getvalue().endswith('\n' + '\n'.join(lines) + '\n')
+    # Long lines are wrapped as with __call__, e.g. when the width is reduced.
+    lines = ['%50s  %20.12f' % ('a rather long label for an energy term', 1.0),
+             'label &' + ' '.join(['word']*30), 'x'*120]
+    for width in 100, 60:
+        screen_log.width = width
+        f1 = StringIO()
+        screen_log._file = f1
+        for line in lines:
+            screen_log(line)
+        f2 = StringIO()
+        screen_log._file = f2
+        screen_log.lines(lines)
+        assert f1.getvalue() == f2.getvalue()
+        assert max(len(line) for line in f2.getvalue().split('\n')) <= width
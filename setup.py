@@ -29,8 +29,10 @@ from glob import glob
 import json
 import os
 import platform
+import shutil
 import subprocess
 import sys
+import tempfile
 
 import numpy as np
 from Cython.Build import cythonize
@@ -270,6 +272,40 @@ def lib_config_magic(prefix, libname, static_config={}, known_include_dirs=[]):
     return lib_config
 
 
+def openmp_works(openmp_config):
+    '''Test if a small OpenMP program compiles and links with the given flags'''
+    from distutils.ccompiler import new_compiler
+    from distutils.errors import CompileError, LinkError
+    from distutils.sysconfig import customize_compiler
+    compiler = new_compiler()
+    customize_compiler(compiler)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fn_src = os.path.join(tmpdir, 'test_openmp.c')
+        with open(fn_src, 'w') as f:
+            f.write('#include <omp.h>\n'
+                    'int main(void) { return omp_get_max_threads() > 0 ? 0 : 1; }\n')
+        with open(os.devnull, 'w') as devnull:
+            # Keep the compiler errors of a failing test off the screen.
+            old_stderr = os.dup(2)
+            os.dup2(devnull.fileno(), 2)
+            try:
+                objects = compiler.compile(
+                    [fn_src], output_dir=tmpdir,
+                    extra_postargs=openmp_config['extra_compile_args'])
+                compiler.link_executable(
+                    objects, os.path.join(tmpdir, 'test_openmp'),
+                    extra_postargs=openmp_config['extra_link_args'])
+            finally:
+                os.dup2(old_stderr, 2)
+                os.close(old_stderr)
+    except (CompileError, LinkError):
+        return False
+    finally:
+        shutil.rmtree(tmpdir)
+    return True
+
+
 # Print the Machine name on screen
 # --------------------------------
 
@@ -317,6 +353,30 @@ known_libint2_include_dirs = ['/usr/include/libint2', '/opt/local/include/libint
 libint2_config = lib_config_magic(
     'libint2', 'int2', libint2_static_config, known_libint2_include_dirs)
 
+# Configuration of OpenMP
+# -----------------------
+
+# The four-center integrals, the Becke weights and the density and Fock matrix
+# evaluation on grids are computed in parallel with OpenMP. The flags can be set in
+# setup.cfg or with environment variables, e.g. OPENMP_EXTRA_COMPILE_ARGS='' compiles
+# without OpenMP. Otherwise, -fopenmp is used if a small test program compiles with
+# it. When it does not, e.g. with Apple clang, HORTON is compiled without OpenMP.
+print('OPENMP Configuration')
+openmp_config = {}
+openmp_config.update(get_lib_config_setup('openmp', 'setup.cfg'))
+openmp_config.update(get_lib_config_env('openmp'))
+if len(openmp_config) == 0:
+    default_openmp_config = {'extra_compile_args': ['-fopenmp'],
+                             'extra_link_args': ['-fopenmp']}
+    if openmp_works(default_openmp_config):
+        print_lib_config('Compiler supports -fopenmp', default_openmp_config)
+        openmp_config.update(default_openmp_config)
+    else:
+        print('   Compiler does not support -fopenmp. Compiling without OpenMP.')
+for key in 'extra_compile_args', 'extra_link_args':
+    openmp_config[key] = [word for word in openmp_config.get(key, []) if len(word) > 0]
+print_lib_config('Final', openmp_config)
+
 # Print versions of (almost) all dependencies
 # -------------------------------------------
 print('Version of dependencies:')
@@ -346,15 +406,17 @@ ext_modules = [
     Extension(
         "horton.gbasis.cext",
         sources=get_sources('horton/gbasis') + ['horton/moments.cpp'],
-        depends=get_depends('horton/gbasis') + ['horton/moments.pxd', 'horton/moments.h'],
+        depends=get_depends('horton/gbasis') + [
+            'horton/moments.pxd', 'horton/moments.h', 'horton/openmp.h'],
         include_dirs=[np.get_include(), '.'] +
                      libint2_config['include_dirs'],
         library_dirs=libint2_config['library_dirs'],
         libraries=libint2_config['libraries'],
         extra_objects=libint2_config['extra_objects'],
         extra_compile_args=libint2_config['extra_compile_args'] +
-                           ['-std=c++11'],
-        extra_link_args=libint2_config['extra_link_args'],
+                           openmp_config['extra_compile_args'] + ['-std=c++11'],
+        extra_link_args=libint2_config['extra_link_args'] +
+                        openmp_config['extra_link_args'],
         language="c++"),
     Extension(
         "horton.grid.cext",
@@ -363,9 +425,11 @@ ext_modules = [
               'horton/moments.cpp'],
         depends=get_depends('horton/grid') + [
               'horton/cell.pxd', 'horton/cell.h',
-              'horton/moments.pxd', 'horton/moments.h'],
+              'horton/moments.pxd', 'horton/moments.h',
+              'horton/openmp.h'],
         include_dirs=[np.get_include(), '.'],
-        extra_compile_args=['-std=c++11'],
+        extra_compile_args=openmp_config['extra_compile_args'] + ['-std=c++11'],
+        extra_link_args=openmp_config['extra_link_args'],
         language="c++", ),
     Extension(
         "horton.meanfield.cext",
@@ -20,8 +20,10 @@
 #
 # --
 
+import mmap
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 
 rules = [
@@ -52,19 +54,55 @@ rules = [
 ]
 
 
+# Matches must start at the beginning of a line, also for the patterns above
+# without an explicit caret. All patterns of one file are combined into a single
+# alternation, such that every file is scanned only once. The patterns match
+# complete lines, so they never compete for the same text.
+compiled_rules = [
+    (fn, re.compile('|'.join(
+        '(?:%s)' % (regex if regex.startswith('^') else '^' + regex)
+        for regex in regexes).encode(), re.M))
+    for fn, regexes in rules
+]
+
+
+def splice(m, newversion):
+    """Return the matched text with all groups replaced by newversion.
+
+    Groups of alternatives that did not participate in the match are skipped.
+    """
+    parts = []
+    end = m.start()
+    for igroup in range(1, len(m.groups()) + 1):
+        if m.start(igroup) == -1:
+            continue
+        parts.append(m.string[end:m.start(igroup)])
+        parts.append(newversion)
+        end = m.end(igroup)
+    parts.append(m.string[end:m.end()])
+    return b''.join(parts)
+
+
+def update_file(fn, regex, newversion):
+    """Replace all version strings matched by regex in file fn."""
+    # The regular expression runs directly on the memory-mapped file and the
+    # file is only rewritten when a version string actually changed.
+    with open(fn, 'r+b') as f:
+        with mmap.mmap(f.fileno(), 0) as mm:
+            data = regex.sub(lambda m: splice(m, newversion), mm)
+            changed = data != mm[:]
+        if changed:
+            f.seek(0)
+            f.write(data)
+            f.truncate()
+
+
 if __name__ == '__main__':
-    newversion = sys.argv[1]
+    newversion = sys.argv[1].encode()
 
-    for fn, regexes in rules:
-        with open(fn) as f:
-            lines = f.readlines()
-        for regex in regexes:
-            r = re.compile(regex)
-            for iline, line in enumerate(lines):
-                m = r.match(line)
-                if m is not None:
-                    for igroup in range(m.lastindex, 0, -1):
-                        line = line[:m.start(igroup)] + newversion + line[m.end(igroup):]
-                    lines[iline] = line
-        with open(fn, 'w') as f:
-            f.writelines(lines)
+    # All files are independent, so they are updated concurrently.
+    with ThreadPoolExecutor(max_workers=len(compiled_rules)) as executor:
+        futures = [executor.submit(update_file, fn, regex, newversion)
+                   for fn, regex in compiled_rules]
+        for future in futures:
+            future.result()